@@ -4,11 +4,13 @@ Agents Module for Manus AI Agent
 This module handles agent orchestration, planning, and execution.
 """
 
-from .orchestrator import AgentOrchestrator
+from .orchestrator import AgentOrchestrator, PlanStep, StepResult
 from .tools import WebScraper, ShellExecutor, FileManager, WebSearchTool
 
 __all__ = [
     'AgentOrchestrator',
+    'PlanStep',
+    'StepResult',
     'WebScraper',
     'ShellExecutor',
     'FileManager',
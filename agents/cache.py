@@ -0,0 +1,285 @@
+"""
+Agent Cache Module
+
+Provides in-memory caches used by the agent orchestrator.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import logging
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Task fragments that vary between otherwise identical tasks: URLs and double-quoted values
+_SLOT_RE = re.compile(r'https?://[^\s"\'<>]+|"([^"]+)"')
+_WORD_RE = re.compile(r"\w+")
+
+
+class LRUCache:
+    """Least-recently-used cache with an optional time-to-live per entry"""
+    
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
+        """
+        Initialize the cache
+        
+        Args:
+            maxsize: Maximum number of entries to keep
+            ttl: Optional lifetime of an entry in seconds (None keeps entries until evicted)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Look up a value and mark it as recently used
+        
+        Args:
+            key: The cache key
+            default: Value to return if the key is missing or expired
+        
+        Returns:
+            The cached value or the default
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any):
+        """
+        Store a value, evicting the least recently used entry if the cache is full
+        
+        Args:
+            key: The cache key
+            value: The value to store
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def clear(self):
+        """Remove all entries"""
+        self._data.clear()
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, self) is not self
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+
+def term_vector(text: str) -> Counter:
+    """
+    Build a bag-of-words term frequency vector for a text
+    
+    Args:
+        text: The text to vectorize
+        
+    Returns:
+        Counter mapping lowercased words to their frequency
+    """
+    return Counter(word.lower() for word in _WORD_RE.findall(text))
+
+
+def vector_norm(vector: Dict[str, int]) -> float:
+    """
+    Compute the Euclidean norm of a term vector
+    
+    Args:
+        vector: The term vector
+        
+    Returns:
+        The vector's norm
+    """
+    return math.hypot(*vector.values())
+
+
+def cosine_similarity(
+    a: Dict[str, int],
+    b: Dict[str, int],
+    a_norm: Optional[float] = None,
+    b_norm: Optional[float] = None
+) -> float:
+    """
+    Compute the cosine similarity of two term vectors
+    
+    Args:
+        a: First term vector
+        b: Second term vector
+        a_norm: Optional precomputed norm of the first vector
+        b_norm: Optional precomputed norm of the second vector
+        
+    Returns:
+        Similarity between 0.0 and 1.0
+    """
+    if len(a) > len(b):
+        a, b, a_norm, b_norm = b, a, b_norm, a_norm
+    dot = sum(count * b.get(term, 0) for term, count in a.items())
+    if not dot:
+        return 0.0
+    if a_norm is None:
+        a_norm = vector_norm(a)
+    if b_norm is None:
+        b_norm = vector_norm(b)
+    return dot / (a_norm * b_norm)
+
+
+class PlanTemplateCache:
+    """
+    Cache of plans keyed by task template
+    
+    URLs and quoted values in a task are treated as slots, so a plan generated for
+    "scrape https://a.com and summarize" can be reused for "scrape https://b.com and
+    summarize" by substituting the slot values into the cached plan. Only tasks whose
+    text outside the slots is identical share a plan; similar wording is not enough,
+    since a single changed word ("allow" vs "block") can change what the plan must do.
+    """
+    
+    # Slot values shorter than this are too likely to occur inside unrelated words of a plan
+    MIN_SLOT_LENGTH = 3
+    
+    def __init__(self, maxsize: int = 256, path: Optional[str] = None):
+        """
+        Initialize the plan template cache
+        
+        Args:
+            maxsize: Maximum number of plan templates to keep
+            path: Optional JSON file used to persist templates between runs
+        """
+        self.maxsize = maxsize
+        self.path = path
+        self._entries = []
+        
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self._entries = json.load(f)[-maxsize:]
+                logger.info(f"Loaded {len(self._entries)} plan templates from {path}")
+            except Exception as e:
+                logger.error(f"Error loading plan cache {path}: {str(e)}")
+    
+    def _templatize(self, task: str) -> Tuple[str, List[str]]:
+        """
+        Replace the slot values in a task with numbered placeholders
+        
+        Args:
+            task: The task description
+            
+        Returns:
+            Tuple of the task template and the extracted slot values
+        """
+        slots = []
+        
+        def replace(match):
+            slots.append(match.group(1) or match.group(0))
+            return f"{{slot_{len(slots) - 1}}}"
+        
+        return _SLOT_RE.sub(replace, task), slots
+    
+    def lookup(self, task: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Find a cached plan for a similar task
+        
+        Args:
+            task: The task description
+            
+        Returns:
+            Plan steps with the task's slot values filled in, or None on a miss
+        """
+        template, slots = self._templatize(task)
+        
+        # Prefer the most recently added plan for the template
+        best_entry = next((entry for entry in reversed(self._entries) if entry["template"] == template), None)
+        if best_entry is None:
+            return None
+        
+        def fill(text):
+            for i, value in enumerate(slots):
+                text = text.replace(f"{{slot_{i}}}", value)
+            return text
+        
+        logger.info(f"Plan cache hit for template: {template}")
+        return [
+            {
+                "description": fill(step["description"]),
+                "subtasks": [fill(subtask) for subtask in step["subtasks"]],
+                "depends_on": list(step.get("depends_on", [])),
+                "status": "pending"
+            }
+            for step in best_entry["plan"]
+        ]
+    
+    def add(self, task: str, plan: List[Dict[str, Any]]):
+        """
+        Store a plan as a template for similar future tasks
+        
+        Args:
+            task: The task description
+            plan: The plan steps generated for the task
+        """
+        template, slots = self._templatize(task)
+        
+        # Short values can't be told apart from fragments of other words, so don't cache those tasks
+        if any(len(value) < self.MIN_SLOT_LENGTH for value in slots):
+            return
+        
+        # Replace slot values only where they stand as whole tokens; with several matching
+        # values at the same position, the alternation tries longer values first
+        slot_index = {}
+        for i, value in enumerate(slots):
+            slot_index.setdefault(value, i)
+        slot_re = re.compile(
+            r"(?<!\w)(?:" + "|".join(re.escape(value) for value in sorted(slot_index, key=len, reverse=True)) + r")(?!\w)"
+        ) if slot_index else None
+        
+        def strip(text):
+            if slot_re is None:
+                return text
+            return slot_re.sub(lambda match: f"{{slot_{slot_index[match.group(0)]}}}", text)
+        
+        self._entries.append({
+            "template": template,
+            "slot_count": len(slots),
+            "plan": [
+                {
+                    "description": strip(step["description"]),
+                    "subtasks": [strip(subtask) for subtask in step["subtasks"]],
+                    "depends_on": list(step.get("depends_on", []))
+                }
+                for step in plan
+            ]
+        })
+        del self._entries[:-self.maxsize]
+        
+        self._save()
+    
+    def _save(self):
+        """Persist the templates to disk if a path is configured"""
+        if not self.path:
+            return
+        
+        # Write then rename so an interrupted save can't leave a truncated cache file
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving plan cache {self.path}: {str(e)}")
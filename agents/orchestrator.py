@@ -5,11 +5,19 @@ Manages the multi-agent system for task planning and execution.
 """
 
 import os
+import re
+import json
+import hashlib
 import logging
 import asyncio
 import time
-from typing import Dict, Any, List, Optional, Tuple
+import heapq
+import textwrap
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional, Tuple, Callable, Iterable
 
+import requests
 from langchain.agents import initialize_agent, Tool
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
@@ -17,6 +25,7 @@ from langchain_openai import ChatOpenAI
 
 from ..api.openrouter import OpenRouterAPI
 from ..config.settings import Settings
+from .cache import LRUCache, PlanTemplateCache, term_vector, vector_norm, cosine_similarity
 from .tools import (
     WebScraper, 
     ShellExecutor,
@@ -24,15 +33,56 @@ from .tools import (
     WebSearchTool
 )
 
+# Optional imports
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# A numbered plan step ("1. Do something") or a bulleted subtask ("- Do something")
+_PLAN_RE = re.compile(r"^[ \t]*(?:(\d+)\.[ \t]+(\S.*?)|[-*][ \t]*(\S.*?))[ \t\r]*$", re.MULTILINE)
+
+# Dependency marker appended to a plan step, e.g. "Summarize the findings [after 1, 2]"
+_AFTER_RE = re.compile(r"\s*\[after\s+([^\]]*)\]", re.IGNORECASE)
+
+# Tokens kept free on top of the completion budget when checking a prompt against the context window
+_TOKEN_SAFETY_MARGIN = 256
+
+# Tool names mentioned in an execution response
+_TOOL_RE = re.compile(r"\b(web_scraper|shell_command|file_manager|web_search)\b", re.IGNORECASE)
+
+# Placeholder tool calls used while tool execution is simulated
+_TOOL_HANDLERS = {
+    "web_scraper": lambda: {"tool": "web_scraper", "args": {"url": "https://example.com"}},
+    "shell_command": lambda: {"tool": "shell_command", "args": {"command": "ls -la"}},
+    "file_manager": lambda: {"tool": "file_manager", "args": {"action": "read", "path": "example.txt"}},
+    "web_search": lambda: {"tool": "web_search", "args": {"query": "example search query"}}
+}
+
+
+def _canonical(template: str) -> str:
+    """
+    Normalize a prompt template so identical prompts are byte-for-byte identical
+    
+    Args:
+        template: The template text
+        
+    Returns:
+        The dedented template with Unix line endings and no surrounding blank lines
+    """
+    return textwrap.dedent(template.replace("\r\n", "\n")).strip()
+
+
 # Prompt templates
-PLANNING_TEMPLATE = """
+# The system prompts only depend on the (static) tool list, so they form a byte-identical
+# prefix across calls that providers can cache. Per-call content goes in the user prompts.
+PLANNING_SYSTEM = _canonical("""
 You are an expert AI planning agent focused on breaking down complex tasks into clear, actionable steps.
 
-TASK: {task}
-
-YOUR GOAL: Create a detailed, step-by-step plan to accomplish this task efficiently.
+YOUR GOAL: Create a detailed, step-by-step plan to accomplish the given task efficiently.
 
 CONSTRAINTS:
 - Consider the available tools: {tools}
@@ -45,20 +95,25 @@ Please respond with a structured plan in the following format:
 1. [Step description]
    - Sub-task 1
    - Sub-task 2
-2. [Next step description]
+2. [Next step description] [after 1]
    - Sub-task 1
    - Sub-task 2
 
-PLAN:
-"""
+If a step needs the results of earlier steps, end its description with [after N] listing those
+step numbers (e.g. [after 1, 3]). Steps without a marker are treated as independent and may run in parallel.
+""")
 
-EXECUTION_TEMPLATE = """
-You are an expert AI execution agent responsible for carrying out specific tasks.
+PLANNING_USER = _canonical("""TASK: {task}
+
+PLAN:""")
 
-TASK STEP: {task_step}
-OVERALL CONTEXT: {context}
+PLANNING_RETRY = _canonical("""Your previous response did not contain any numbered steps.
+Reply with the plan strictly in the required format.""")
 
-YOUR GOAL: Execute this specific step as effectively as possible, using the tools available to you.
+EXECUTION_SYSTEM = _canonical("""
+You are an expert AI execution agent responsible for carrying out specific tasks.
+
+YOUR GOAL: Execute the given task step as effectively as possible, using the tools available to you.
 
 AVAILABLE TOOLS: {tools}
 
@@ -68,9 +123,34 @@ INSTRUCTIONS:
 3. Report back with the results, including any relevant information retrieved
 4. If you encounter any errors or issues, try an alternative approach
 5. If you require user input or authentication, request it clearly
+""")
+
+EXECUTION_USER = _canonical("""TASK STEP: {task_step}
 
 Execute this step now.
-"""
+
+OVERALL CONTEXT: {context}""")
+
+
+@dataclass(slots=True)
+class PlanStep:
+    """A single step of a task plan"""
+    
+    description: str
+    subtasks: List[str] = field(default_factory=list)
+    depends_on: List[int] = field(default_factory=list)
+    status: str = "pending"
+
+
+@dataclass(slots=True)
+class StepResult:
+    """Outcome of executing a plan step"""
+    
+    execution_text: str
+    tool_executions: List[Dict[str, Any]]
+    status: str
+    summary: str
+
 
 class AgentOrchestrator:
     """
@@ -87,9 +167,27 @@ class AgentOrchestrator:
         """
         self.openrouter_api = openrouter_api
         self.settings = settings
-        self.task_history = []
+        self._task_history = deque(maxlen=settings.task_history_size)
         self.current_plan = None
-        self.execution_results = {}
+        
+        # Prompt context from previous steps: the last few summaries verbatim, plus the older
+        # summaries most relevant to the current step, so the context doesn't grow with the plan
+        self._recent_summaries = deque(maxlen=settings.context_window_steps)
+        self._older_summaries = []
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE:
+            # tiktoken downloads its BPE files on first use, so offline this falls back to the estimate
+            try:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(settings.default_model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning("Failed to load tiktoken encoding, estimating token counts: %s", e)
+        self._resp_cache = LRUCache(maxsize=settings.response_cache_size, ttl=settings.response_cache_ttl)
+        self._plan_cache = PlanTemplateCache(
+            path=settings.plan_cache_path
+        ) if settings.enable_plan_cache else None
         
         # Initialize tools
         self.web_scraper = WebScraper()
@@ -101,16 +199,9 @@ class AgentOrchestrator:
         self.file_manager = FileManager()
         self.web_search = WebSearchTool()
         
-        logger.info("Agent orchestrator initialized with all tools")
-    
-    def get_available_tools(self) -> List[Tool]:
-        """
-        Get the list of available tools for agent use
-        
-        Returns:
-            List of LangChain Tool objects
-        """
-        return [
+        # The tool list is fixed after initialization, so build it and its description once,
+        # sorted by name so the rendered prompts don't depend on declaration order
+        self._tools = sorted([
             Tool(
                 name="web_scraper",
                 func=self.web_scraper.scrape,
@@ -131,9 +222,250 @@ class AgentOrchestrator:
                 func=self.web_search.search,
                 description="Performs a web search for the provided query"
             )
-        ]
+        ], key=lambda tool: tool.name)
+        self._tools_desc = "\n".join(f"- {tool.name}: {tool.description}" for tool in self._tools)
+        self._tool_funcs = {tool.name: tool.func for tool in self._tools}
+        
+        # The system prompts only depend on the tool list, so render them once as well
+        self._planning_system = self._system_message(PLANNING_SYSTEM.format(tools=self._tools_desc))
+        self._execution_system = self._system_message(EXECUTION_SYSTEM.format(tools=self._tools_desc))
+        self._execution_system_tokens = self._prompt_tokens([self._execution_system])
+        
+        logger.info("Agent orchestrator initialized with all tools")
+    
+    @property
+    def task_history(self) -> deque:
+        """
+        Results of the most recent tasks, oldest first
+        
+        The history is bounded by settings.task_history_size; the oldest entries are
+        dropped as new tasks complete. Clear it in place with task_history.clear().
+        
+        Returns:
+            Deque of task results
+        """
+        return self._task_history
+    
+    def get_available_tools(self) -> List[Tool]:
+        """
+        Get the list of available tools for agent use
+        
+        Returns:
+            List of LangChain Tool objects
+        """
+        return self._tools
+    
+    def _count_tokens(self, text: str) -> int:
+        """
+        Count the tokens in a text, estimating ~4 characters per token without tiktoken
+        
+        Args:
+            text: The text to measure
+            
+        Returns:
+            Number of tokens
+        """
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return (len(text) + 3) // 4
+    
+    def _prompt_tokens(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Count the tokens in the content of a list of chat messages
+        
+        Args:
+            messages: The chat messages
+            
+        Returns:
+            Number of tokens
+        """
+        total = 0
+        for message in messages:
+            content = message["content"]
+            if isinstance(content, list):
+                content = "".join(part.get("text", "") for part in content)
+            total += self._count_tokens(content)
+        return total
+    
+    def _truncate_tokens(self, text: str, max_tokens: int) -> str:
+        """
+        Truncate a text to a token budget, dropping the oldest (leading) content first
+        
+        Args:
+            text: The text to truncate
+            max_tokens: Maximum number of tokens to keep
+            
+        Returns:
+            The truncated text
+        """
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text)
+            if len(tokens) <= max_tokens:
+                return text
+            return self._encoding.decode(tokens[-max_tokens:])
+        return text[-max_tokens * 4:]
+    
+    def _record_summary(self, step_num: int, summary: str):
+        """
+        Add a step summary to the context window used by later steps
+        
+        Args:
+            step_num: The step number
+            summary: The step's result summary
+        """
+        recent = self._recent_summaries
+        if len(recent) == recent.maxlen:
+            oldest_num, oldest_summary = recent[0] if recent else (step_num, summary)
+            vector = term_vector(oldest_summary)
+            self._older_summaries.append((oldest_num, oldest_summary, vector, vector_norm(vector)))
+        recent.append((step_num, summary))
+    
+    def _relevant_summaries(self, query: str) -> List[Tuple[int, str]]:
+        """
+        Retrieve the older step summaries most relevant to a query
+        
+        Args:
+            query: Text describing the current step
+            
+        Returns:
+            Up to context_retrieval_k (step number, summary) pairs, ordered by step number
+        """
+        if not self._older_summaries or self.settings.context_retrieval_k <= 0:
+            return []
+        
+        query_vector = term_vector(query)
+        query_norm = vector_norm(query_vector)
+        top = heapq.nlargest(
+            self.settings.context_retrieval_k,
+            self._older_summaries,
+            key=lambda item: cosine_similarity(query_vector, item[2], query_norm, item[3])
+        )
+        # Order by step number rather than score so the prompt layout stays deterministic
+        return sorted((step_num, summary) for step_num, summary, _, _ in top)
     
-    async def plan_task(self, task: str) -> List[Dict[str, Any]]:
+    def _system_message(self, content: str) -> Dict[str, Any]:
+        """
+        Build a system message marked as cacheable by the provider
+        
+        Args:
+            content: The system prompt text
+            
+        Returns:
+            Chat message dictionary
+        """
+        return {
+            "role": "system",
+            "content": [
+                {"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}
+            ]
+        }
+    
+    async def _cached_complete(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+        on_lines: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a completion, reusing a cached response for identical deterministic requests
+        
+        Only requests with temperature 0 are cached, since sampled completions are
+        expected to differ between calls.
+        
+        Args:
+            messages: The chat messages to send
+            temperature: Sampling temperature
+            max_tokens: Maximum number of tokens to generate
+            on_lines: Optional callback receiving the completion text in whole lines as it arrives
+            
+        Returns:
+            The completion response
+        """
+        if temperature != 0:
+            return await self._request_completion(messages, temperature, max_tokens, on_lines)
+        
+        key = hashlib.sha256(
+            f"{self.openrouter_api.default_model}|{temperature}|{max_tokens}|{json.dumps(messages, sort_keys=True)}".encode()
+        ).hexdigest()
+        
+        response = self._resp_cache.get(key)
+        if response is not None:
+            logger.info("Using cached completion")
+            if on_lines:
+                on_lines(response.get("completion", ""))
+            return response
+        
+        response = await self._request_completion(messages, temperature, max_tokens, on_lines)
+        
+        # Don't cache failed requests
+        if "error" not in response and response.get("completion"):
+            self._resp_cache.set(key, response)
+        
+        return response
+    
+    async def _request_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+        on_lines: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Request a completion from the API, streaming it when a line consumer is given
+        
+        Streaming lets the caller parse the response while the rest is still being generated.
+        
+        Args:
+            messages: The chat messages to send
+            temperature: Sampling temperature
+            max_tokens: Maximum number of tokens to generate
+            on_lines: Optional callback receiving the completion text in whole lines as it arrives
+            
+        Returns:
+            The completion response
+        """
+        if not (on_lines and self.settings.stream_completions):
+            response = await self.openrouter_api.agenerate_completion(
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            if on_lines:
+                on_lines(response.get("completion", ""))
+            return response
+        
+        parts = []
+        pending = ""
+        try:
+            async for chunk in self.openrouter_api.astream_completion(
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            ):
+                parts.append(chunk)
+                
+                # Hand over every complete line, keeping the unterminated tail for the next chunk
+                complete, newline, pending = (pending + chunk).rpartition("\n")
+                if newline:
+                    on_lines(complete)
+        except requests.exceptions.RequestException as e:
+            # Report the failure like the non-streaming path, so it isn't cached or retried
+            return {
+                "error": str(e),
+                "completion": "".join(parts),
+                "model": self.openrouter_api.default_model
+            }
+        
+        if pending:
+            on_lines(pending)
+        
+        return {
+            "completion": "".join(parts),
+            "model": self.openrouter_api.default_model
+        }
+    
+    async def plan_task(self, task: str) -> List[PlanStep]:
         """
         Generate a plan for executing a complex task
         
@@ -143,127 +475,193 @@ class AgentOrchestrator:
         Returns:
             List of steps to execute the task
         """
-        logger.info(f"Planning task: {task}")
-        
-        # Prepare tools description for the prompt
-        tools_desc = "\n".join([f"- {tool.name}: {tool.description}" for tool in self.get_available_tools()])
+        logger.info("Planning task: %s", task)
+        
+        # Reuse the plan of a sufficiently similar earlier task if there is one
+        if self._plan_cache is not None:
+            cached_plan = self._plan_cache.lookup(task)
+            if cached_plan is not None:
+                cached_plan = [PlanStep(**step) for step in cached_plan]
+                self.current_plan = cached_plan
+                logger.info("Reusing cached plan with %d steps", len(cached_plan))
+                return cached_plan
+        
+        # Create planning prompt with the static instructions first
+        planning_messages = [
+            self._planning_system,
+            {"role": "user", "content": PLANNING_USER.format(task=task)}
+        ]
         
-        # Create planning prompt
-        planning_prompt = PLANNING_TEMPLATE.format(
-            task=task,
-            tools=tools_desc
-        )
+        # The task itself can't be trimmed, so only warn if the prompt is likely to be rejected
+        prompt_tokens = self._prompt_tokens(planning_messages)
+        if prompt_tokens + self.settings.max_planning_tokens > self.settings.context_window - _TOKEN_SAFETY_MARGIN:
+            logger.warning("Planning prompt (%d tokens) may exceed the model's context window", prompt_tokens)
         
-        # Get planning response from LLM
-        planning_response = self.openrouter_api.generate_completion(
-            prompt=planning_prompt,
+        # Get planning response from LLM, parsing it into steps as it streams in
+        plan_steps = []
+        planning_response = await self._cached_complete(
+            messages=planning_messages,
             temperature=self.settings.planning_temperature,
-            max_tokens=self.settings.max_planning_tokens
+            max_tokens=self.settings.max_planning_tokens,
+            on_lines=lambda text: self._parse_plan(text, plan_steps)
         )
         
-        # Parse the planning response into steps
-        plan_text = planning_response.get("completion", "")
-        plan_steps = self._parse_plan(plan_text)
+        # A response without numbered steps is almost always a format slip, so ask once more;
+        # a failed request would just fail again
+        if not plan_steps and "error" not in planning_response:
+            logger.warning("Planner returned no steps, retrying with a corrective prompt")
+            retry_messages = list(planning_messages)
+            if planning_response.get("completion"):
+                retry_messages.append({"role": "assistant", "content": planning_response["completion"]})
+            retry_messages.append({"role": "user", "content": PLANNING_RETRY})
+            await self._cached_complete(
+                messages=retry_messages,
+                temperature=0,
+                max_tokens=self.settings.max_planning_tokens,
+                on_lines=lambda text: self._parse_plan(text, plan_steps)
+            )
+        
+        if plan_steps and self._plan_cache is not None:
+            self._plan_cache.add(task, [asdict(step) for step in plan_steps])
         
         self.current_plan = plan_steps
-        logger.info(f"Generated plan with {len(plan_steps)} steps")
+        logger.info("Generated plan with %d steps", len(plan_steps))
         
         return plan_steps
     
-    def _parse_plan(self, plan_text: str) -> List[Dict[str, Any]]:
+    def _parse_plan(self, plan_text: str, steps: Optional[List[PlanStep]] = None) -> List[PlanStep]:
         """
         Parse a plan text into structured steps
         
         Args:
             plan_text: The plan text from the LLM
+            steps: Optional steps parsed so far, extended in place when parsing a streamed plan
             
         Returns:
-            List of plan steps as dictionaries
+            List of plan steps
         """
-        # Simple parsing logic - this could be improved with more robust parsing
-        lines = plan_text.strip().split("\n")
+        if steps is None:
+            steps = []
+        
+        # Single regex pass over the whole plan; subtasks attach to the most recent step.
+        # Whitespace is collapsed so re-generated plans render to identical prompts.
+        for match in _PLAN_RE.finditer(plan_text):
+            if match.group(1):
+                description, depends_on = self._split_dependencies(match.group(2))
+                steps.append(PlanStep(description=" ".join(description.split()), depends_on=depends_on))
+            elif steps:
+                steps[-1].subtasks.append(" ".join(match.group(3).split()))
         
-        steps = []
-        current_step = None
-        current_subtasks = []
+        return steps
+    
+    def _split_dependencies(self, description: str) -> Tuple[str, List[int]]:
+        """
+        Strip an [after N, M] dependency marker from a step description
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Check if this is a step line (starts with a number)
-            if line[0].isdigit() and ". " in line:
-                # If we have a current step, add it to steps before starting a new one
-                if current_step is not None:
-                    steps.append({
-                        "description": current_step,
-                        "subtasks": current_subtasks,
-                        "status": "pending"
-                    })
-                
-                # Start a new step
-                step_parts = line.split(". ", 1)
-                if len(step_parts) == 2:
-                    current_step = step_parts[1]
-                    current_subtasks = []
+        Args:
+            description: The raw step description from the plan
             
-            # Check if this is a subtask line
-            elif line.startswith("-") or line.startswith("*"):
-                subtask = line[1:].strip()
-                if subtask and current_step is not None:
-                    current_subtasks.append(subtask)
-        
-        # Add the last step if there is one
-        if current_step is not None:
-            steps.append({
-                "description": current_step,
-                "subtasks": current_subtasks,
-                "status": "pending"
-            })
+        Returns:
+            Tuple of the cleaned description and the step numbers it depends on
+        """
+        depends_on = []
+        match = _AFTER_RE.search(description)
+        if match:
+            depends_on = [int(num) for num in re.findall(r"\d+", match.group(1))]
+            description = (description[:match.start()] + description[match.end():]).strip()
         
-        return steps
+        return description, depends_on
     
-    async def execute_plan(self, plan: List[Dict[str, Any]], yolo_mode: bool = False) -> Dict[str, Any]:
+    async def execute_plan(
+        self,
+        plan: List[PlanStep],
+        yolo_mode: bool = False,
+        on_progress: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
         """
         Execute a task plan
         
         Args:
             plan: The plan steps to execute
             yolo_mode: Whether to run in autonomous mode without asking for permission
+            on_progress: Optional callback receiving a progress message as each step finishes
             
         Returns:
             Results of task execution
         """
-        logger.info(f"Executing plan with {len(plan)} steps, YOLO mode: {yolo_mode}")
+        logger.info("Executing plan with %d steps, YOLO mode: %s", len(plan), yolo_mode)
+        
+        if not plan:
+            now = time.monotonic()
+            return {
+                "steps": [],
+                "overall_status": "empty",
+                "start_time": now,
+                "wallclock_start": time.time(),
+                "end_time": now,
+                "duration": 0.0
+            }
         
         results = {
             "steps": [],
             "overall_status": "in_progress",
-            "start_time": time.time()
+            "start_time": time.monotonic(),
+            "wallclock_start": time.time()
+        }
+        
+        # Results from a previous plan must not leak into this plan's step context
+        self._recent_summaries.clear()
+        self._older_summaries.clear()
+        
+        # Build the dependency graph, ignoring references to unknown steps or the step itself
+        step_nums = range(1, len(plan) + 1)
+        pending = {
+            step_num: {dep for dep in step.depends_on if dep in step_nums and dep != step_num}
+            for step_num, step in zip(step_nums, plan)
         }
         
-        for i, step in enumerate(plan):
-            step_num = i + 1
-            logger.info(f"Executing step {step_num}: {step['description']}")
+        while pending:
+            # Kahn's algorithm: every step whose dependencies have finished is ready to run
+            ready = sorted(step_num for step_num, deps in pending.items() if not deps)
+            if not ready:
+                # Dependency cycle - break it by running the lowest-numbered remaining step
+                ready = [min(pending)]
             
-            # Execute the step
-            step_result = await self.execute_step(step, step_num, len(plan), yolo_mode)
+            logger.info("Executing steps %s concurrently", ready)
             
-            # Record the result
-            results["steps"].append({
-                "step_num": step_num,
-                "description": step["description"],
-                "result": step_result,
-                "status": step_result.get("status", "unknown")
-            })
+            # Execute the independent steps concurrently
+            step_results = await asyncio.gather(*[
+                self.execute_step(plan[step_num - 1], step_num, len(plan), yolo_mode)
+                for step_num in ready
+            ])
             
-            # Update the plan step status
-            step["status"] = step_result.get("status", "unknown")
+            # Merge the results once the whole level has finished
+            for step_num, step_result in zip(ready, step_results):
+                step = plan[step_num - 1]
+                self._record_summary(step_num, step_result.summary)
+                
+                # Record the result
+                results["steps"].append({
+                    "step_num": step_num,
+                    "description": step.description,
+                    "result": asdict(step_result),
+                    "status": step_result.status
+                })
+                
+                # Update the plan step status
+                step.status = step_result.status
+                del pending[step_num]
+                
+                if on_progress:
+                    on_progress(f"Step {step_num}/{len(plan)} {step_result.status}: {step.description}")
             
-            # If the step failed and we're not in YOLO mode, stop execution
-            if step_result.get("status") == "failed" and not yolo_mode:
-                logger.warning(f"Step {step_num} failed, stopping plan execution")
+            for deps in pending.values():
+                deps.difference_update(ready)
+            
+            # If a step failed and we're not in YOLO mode, stop execution
+            failed = [step_num for step_num, step_result in zip(ready, step_results) if step_result.status == "failed"]
+            if failed and not yolo_mode:
+                logger.warning("Steps %s failed, stopping plan execution", failed)
                 results["overall_status"] = "failed"
                 break
         
@@ -271,18 +669,19 @@ class AgentOrchestrator:
         if results["overall_status"] != "failed":
             results["overall_status"] = "completed"
         
-        results["end_time"] = time.time()
+        # start_time/end_time come from the monotonic clock, so only their difference is meaningful
+        results["end_time"] = time.monotonic()
         results["duration"] = results["end_time"] - results["start_time"]
         
         return results
     
     async def execute_step(
         self, 
-        step: Dict[str, Any], 
+        step: PlanStep, 
         step_num: int, 
         total_steps: int,
         yolo_mode: bool
-    ) -> Dict[str, Any]:
+    ) -> StepResult:
         """
         Execute a single step in the plan
         
@@ -295,101 +694,145 @@ class AgentOrchestrator:
         Returns:
             Result of step execution
         """
+        logger.info("Executing step %d: %s", step_num, step.description)
+        
         # Create context for execution agent
         context = f"This is step {step_num} of {total_steps} in the plan."
         
-        # If there are previous steps, add their results to the context
-        if step_num > 1 and self.execution_results:
-            prev_results = []
-            for prev_num in range(1, step_num):
-                if prev_num in self.execution_results:
-                    prev_result = self.execution_results[prev_num]
-                    prev_results.append(f"Step {prev_num} result: {prev_result.get('summary', 'No summary available')}")
-            
-            if prev_results:
-                context += "\n\nPrevious step results:\n" + "\n".join(prev_results)
-        
-        # Prepare tools description for the prompt
-        tools_desc = "\n".join([f"- {tool.name}: {tool.description}" for tool in self.get_available_tools()])
+        task_step = step.description + "\n\nSubtasks:\n" + "\n".join([f"- {st}" for st in step.subtasks])
         
-        # Create execution prompt
-        execution_prompt = EXECUTION_TEMPLATE.format(
-            task_step=step["description"] + "\n\nSubtasks:\n" + "\n".join([f"- {st}" for st in step["subtasks"]]),
-            context=context,
-            tools=tools_desc
+        # If there are previous steps, add their results to the context
+        prev_results = []
+        for prev_num, prev_summary in self._relevant_summaries(task_step):
+            prev_results.append(f"Step {prev_num} result: {prev_summary}")
+        for prev_num, prev_summary in self._recent_summaries:
+            prev_results.append(f"Step {prev_num} result: {prev_summary}")
+        
+        # Drop the oldest previous results if the prompt would not fit the model's context window
+        budget = (
+            self.settings.context_window
+            - self.settings.max_execution_tokens
+            - _TOKEN_SAFETY_MARGIN
+            - self._execution_system_tokens
+            - self._count_tokens(EXECUTION_USER.format(task_step=task_step, context=context))
         )
+        prev_tokens = [self._count_tokens(prev_result) for prev_result in prev_results]
+        total_tokens = sum(prev_tokens)
+        dropped = 0
+        while prev_results and total_tokens > budget:
+            total_tokens -= prev_tokens.pop(0)
+            prev_results.pop(0)
+            dropped += 1
+        if dropped:
+            logger.warning("Dropped %d previous results from step %d context to fit the context window", dropped, step_num)
+        
+        if prev_results:
+            context += "\n\nPrevious step results:\n" + self._truncate_tokens(
+                "\n".join(prev_results),
+                self.settings.max_context_tokens
+            )
         
-        # Get execution response from LLM
-        execution_response = self.openrouter_api.generate_completion(
-            prompt=execution_prompt,
+        # Create execution prompt, keeping the per-step context at the tail
+        execution_messages = [
+            self._execution_system,
+            {"role": "user", "content": EXECUTION_USER.format(task_step=task_step, context=context)}
+        ]
+        
+        # Get execution response from LLM, picking up tool mentions as it streams in
+        tool_names = {}
+        execution_response = await self._cached_complete(
+            messages=execution_messages,
             temperature=self.settings.execution_temperature,
-            max_tokens=self.settings.max_execution_tokens
+            max_tokens=self.settings.max_execution_tokens,
+            on_lines=lambda text: self._scan_tool_names(text, tool_names)
         )
         
         # Parse the execution plan
         execution_text = execution_response.get("completion", "")
         
-        # Here we would actually execute the tools based on the agent's response
-        # For now, we'll just simulate execution
-        tool_executions = self._simulate_tool_execution(execution_text, yolo_mode)
-        
-        # Prepare result
-        result = {
-            "execution_text": execution_text,
-            "tool_executions": tool_executions,
-            "status": "completed" if all(te["success"] for te in tool_executions) else "failed",
-            "summary": self._generate_summary(execution_text, tool_executions)
-        }
+        # Execute the tools mentioned in the agent's response
+        tool_executions = await self._execute_tools(tool_names, yolo_mode)
         
-        # Store the result
-        self.execution_results[step_num] = result
+        return StepResult(
+            execution_text=execution_text,
+            tool_executions=tool_executions,
+            status="completed" if all(te["success"] for te in tool_executions) else "failed",
+            summary=self._generate_summary(execution_text, tool_executions)
+        )
+    
+    def _scan_tool_names(self, text: str, tool_names: Dict[str, None]):
+        """
+        Record the tools mentioned in a piece of execution text
         
-        return result
+        Args:
+            text: A chunk of the execution agent's response
+            tool_names: Ordered mapping of tool names found so far, updated in place
+        """
+        # Single scan for tool names, keeping the order in which they are first mentioned
+        for match in _TOOL_RE.finditer(text):
+            tool_names.setdefault(match.group(1).lower())
     
-    def _simulate_tool_execution(self, execution_text: str, yolo_mode: bool) -> List[Dict[str, Any]]:
+    async def _execute_tools(self, tool_names: Iterable[str], yolo_mode: bool) -> List[Dict[str, Any]]:
         """
-        Parse an execution response and execute any identified tools
+        Execute the tools identified in an execution response
+        
+        All tool calls of a step run concurrently; a call that raises is reported as a
+        failed execution without affecting the other calls.
         
         Args:
-            execution_text: The execution agent's response
+            tool_names: Names of the tools mentioned by the execution agent
             yolo_mode: Whether to run in autonomous mode
             
         Returns:
             List of tool execution results
         """
-        # In a real implementation, this would parse the execution_text to identify tools to execute
-        # For now, we'll just simulate it with a placeholder implementation
-        
         # This is a placeholder - in a real implementation, we'd extract actual tool calls
-        tool_calls = []
-        if "web_scraper" in execution_text.lower():
-            tool_calls.append({"tool": "web_scraper", "args": {"url": "https://example.com"}})
-        if "shell_command" in execution_text.lower():
-            tool_calls.append({"tool": "shell_command", "args": {"command": "ls -la"}})
-        if "file_manager" in execution_text.lower():
-            tool_calls.append({"tool": "file_manager", "args": {"action": "read", "path": "example.txt"}})
-        if "web_search" in execution_text.lower():
-            tool_calls.append({"tool": "web_search", "args": {"query": "example search query"}})
-        
-        # Execute the identified tools
+        tool_calls = [_TOOL_HANDLERS[name]() for name in tool_names]
+        
+        if not yolo_mode:
+            # In non-YOLO mode, we'd check for user permission here
+            # but for now, we'll just assume all are approved
+            pass
+        
+        # Execute the identified tools concurrently
+        outcomes = await asyncio.gather(
+            *[self._invoke_tool(call) for call in tool_calls],
+            return_exceptions=True
+        )
+        
         execution_results = []
-        for call in tool_calls:
-            if not yolo_mode:
-                # In non-YOLO mode, we'd check for user permission here
-                # but for the simulation, we'll just assume all are approved
-                pass
-                
-            # In a real implementation, we would actually execute the tool
-            # For now, just simulate success
-            execution_results.append({
-                "tool": call["tool"],
-                "args": call["args"],
-                "success": True,
-                "result": f"Simulated result for {call['tool']}"
-            })
+        for call, outcome in zip(tool_calls, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error("Tool %s raised an error: %s", call["tool"], outcome)
+                outcome = {"success": False, "error": str(outcome)}
+            
+            execution_results.append({"tool": call["tool"], "args": call["args"], **outcome})
                 
         return execution_results
     
+    async def _invoke_tool(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Invoke a single tool call
+        
+        Tool calls are simulated unless the execute_tools setting is enabled, in which
+        case the (blocking) tool function runs in a worker thread.
+        
+        Args:
+            call: Dictionary with the tool name and its arguments
+            
+        Returns:
+            Dictionary with the success flag, the result and any error message
+        """
+        if not self.settings.execute_tools:
+            return {"success": True, "result": f"Simulated result for {call['tool']}"}
+        
+        result = await asyncio.to_thread(self._tool_funcs[call["tool"]], **call["args"])
+        outcome = {"success": result.get("success", False), "result": result}
+        if "error" in result:
+            outcome["error"] = result["error"]
+        
+        return outcome
+    
     def _generate_summary(self, execution_text: str, tool_executions: List[Dict[str, Any]]) -> str:
         """
         Generate a summary of the step execution
@@ -404,7 +847,7 @@ class AgentOrchestrator:
         # In a real implementation, we might send this back to the LLM for summarization
         # For now, generate a simple summary
         
-        success_count = sum(1 for te in tool_executions if te["success"])
+        success_count = sum(te["success"] for te in tool_executions)
         failed_count = len(tool_executions) - success_count
         
         if failed_count == 0:
@@ -416,35 +859,44 @@ class AgentOrchestrator:
         
         return f"Step execution: {status} Tools used: {', '.join(te['tool'] for te in tool_executions)}."
     
-    async def run_task(self, task: str, yolo_mode: bool = False) -> Dict[str, Any]:
+    async def run_task(
+        self,
+        task: str,
+        yolo_mode: bool = False,
+        on_progress: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
         """
         Run a complete task through planning and execution
         
         Args:
             task: The task description
             yolo_mode: Whether to run in autonomous mode
+            on_progress: Optional callback receiving progress messages, called on the
+                event loop's thread
             
         Returns:
             Complete task results
         """
-        logger.info(f"Running task: {task}, YOLO mode: {yolo_mode}")
+        logger.info("Running task: %s, YOLO mode: %s", task, yolo_mode)
         
         # Generate plan
         plan = await self.plan_task(task)
+        if on_progress:
+            on_progress(f"Generated plan with {len(plan)} steps")
         
         # Execute plan
-        execution_results = await self.execute_plan(plan, yolo_mode)
+        execution_results = await self.execute_plan(plan, yolo_mode, on_progress)
         
         # Combine results
         results = {
             "task": task,
-            "plan": plan,
+            "plan": [asdict(step) for step in plan],
             "execution": execution_results,
             "yolo_mode": yolo_mode,
             "timestamp": time.time()
         }
         
         # Record in history
-        self.task_history.append(results)
+        self._task_history.append(results)
         
         return results 
\ No newline at end of file
@@ -5,13 +5,22 @@ Provides tool implementations for agents to use during task execution.
 """
 
 import os
+import re
+import atexit
+import threading
+import shlex
+import signal
+import itertools
 import logging
 import subprocess
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import json
+import mmap
 import requests
-from typing import Dict, Any, List, Optional
-from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional, Iterable, Tuple
 
 # Optional imports
 try:
@@ -21,11 +30,41 @@ except ImportError:
     DOCKER_AVAILABLE = False
 
 try:
-    from bs4 import BeautifulSoup
+    from bs4 import BeautifulSoup, SoupStrainer
     BS4_AVAILABLE = True
 except ImportError:
     BS4_AVAILABLE = False
 
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# BeautifulSoup backend: the C-based lxml parser when installed, the pure-Python one otherwise
+_HTML_PARSER = "lxml" if LXML_AVAILABLE else "html.parser"
+
+# Charset declared in a <meta> tag near the start of an HTML document
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+# Scraped content is truncated to this many characters, so larger bodies aren't downloaded in full
+_MAX_CONTENT_CHARS = 5000
+
+# Largest JSON body that is downloaded and parsed; bigger ones are returned as truncated text
+_MAX_JSON_BYTES = 10 * 1024 * 1024
+
+# Files larger than this are read through a memory map
+_MMAP_THRESHOLD = 1024 * 1024
+
+# Elements whose text is left out of extracted page content
+_SKIP_TAGS = frozenset({"script", "style", "meta", "link"})
+
+# An absolute http(s) URL with a host
+_URL_RE = re.compile(r"^https?://[^/\s]+", re.IGNORECASE)
+
+# CSS selectors simple enough to filter on while parsing: "tag", ".class", "#id", "tag.class", "tag#id"
+_SIMPLE_SELECTOR_RE = re.compile(r"^(?P<tag>[a-zA-Z][\w-]*)?(?:(?P<kind>[.#])(?P<value>[\w-]+))?$")
+
 logger = logging.getLogger(__name__)
 
 class WebScraper:
@@ -35,17 +74,143 @@ class WebScraper:
         """Initialize the web scraper tool"""
         self.session = requests.Session()
         self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+            # Only advertises the compression schemes urllib3 can decode (br/zstd if their packages are installed)
+            **make_headers(accept_encoding=True)
         })
+        
+        # Keep enough pooled connections per host for concurrent scraping of the same site
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=64,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         logger.info("Web scraper tool initialized")
     
+    def _strainer_for(self, selector: str) -> Optional["SoupStrainer"]:
+        """
+        Build a parse filter for a simple CSS selector
+        
+        Args:
+            selector: The CSS selector
+            
+        Returns:
+            SoupStrainer matching the selector, or None if the selector is not simple
+        """
+        match = _SIMPLE_SELECTOR_RE.match(selector.strip())
+        if not match or not (match.group("tag") or match.group("kind")):
+            return None
+        
+        attrs = {}
+        value = match.group("value")
+        if match.group("kind") == "#":
+            attrs["id"] = value
+        elif match.group("kind") == ".":
+            # The class attribute is still a raw space-separated string while parsing
+            attrs["class"] = lambda classes: classes is not None and value in (
+                classes.split() if isinstance(classes, str) else classes
+            )
+        return SoupStrainer(match.group("tag"), attrs=attrs)
+    
+    def _extract_text(
+        self,
+        chunks: Iterable[bytes],
+        encoding: Optional[str] = None,
+        max_chars: Optional[int] = None
+    ) -> Tuple[Optional[str], str]:
+        """
+        Extract the title and visible text of an HTML document without building a tree
+        
+        Args:
+            chunks: The raw document bytes, in chunks
+            encoding: Optional encoding declared by the server
+            max_chars: Optional number of characters after which to stop reading the document
+            
+        Returns:
+            Tuple of the page title (None if missing) and its text, one stripped text node per line
+        """
+        chunks = iter(chunks)
+        first_chunk = next(chunks, b"")
+        if encoding is None:
+            # libxml2 assumes Latin-1 for undeclared documents; prefer a <meta> charset, then UTF-8
+            match = _META_CHARSET_RE.search(first_chunk, 0, 4096)
+            encoding = match.group(1).decode("ascii") if match else "utf-8"
+        
+        parser = etree.HTMLPullParser(events=("start", "end"), encoding=encoding, remove_comments=True, remove_pis=True)
+        parts = []
+        length = 0
+        title = None
+        skip_depth = 0
+        
+        def emit(text):
+            nonlocal length
+            if text and skip_depth == 0:
+                text = text.strip()
+                if text:
+                    parts.append(text)
+                    length += len(text) + 1
+        
+        # A final None closes the parser so the events for any still-open elements are emitted
+        for chunk in itertools.chain((first_chunk,), chunks, (None,)):
+            if chunk is None:
+                parser.close()
+            else:
+                parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == "start":
+                    # The text before this element is complete: the parent's leading text or the previous sibling's tail
+                    previous = element.getprevious()
+                    if previous is not None:
+                        emit(previous.tail)
+                    elif element.getparent() is not None:
+                        emit(element.getparent().text)
+                    if element.tag in _SKIP_TAGS:
+                        skip_depth += 1
+                else:
+                    # The last text inside this element is complete: its own text or its last child's tail
+                    emit(element[-1].tail if len(element) else element.text)
+                    if element.tag == "title" and title is None:
+                        title = element.text
+                    if element.tag in _SKIP_TAGS:
+                        skip_depth -= 1
+                    # Drop the subtree we've consumed, but keep the tail that follows it
+                    element.clear(keep_tail=True)
+            
+            if max_chars is not None and length > max_chars:
+                break
+        
+        return title, "\n".join(parts)
+    
+    def _read_limited(self, response: requests.Response, limit: int) -> bytearray:
+        """
+        Read at most limit bytes of a streamed response body
+        
+        Args:
+            response: The streamed response
+            limit: Maximum number of bytes to read
+            
+        Returns:
+            The (possibly truncated) body, without copying it into an immutable bytes object
+        """
+        buffer = bytearray()
+        for chunk in response.iter_content(chunk_size=8192):
+            buffer += chunk
+            if len(buffer) >= limit:
+                break
+        del buffer[limit:]
+        return buffer
+    
     def scrape(self, url: str, selector: Optional[str] = None, credentials: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """
         Scrape content from a URL
         
         Args:
             url: The URL to scrape
-            selector: Optional CSS selector to extract specific content
+            selector: Optional CSS selector to extract specific content. Simple selectors
+                ("tag", ".class", "#id", "tag.class", "tag#id") are applied while parsing,
+                so the rest of the page is never built into a tree.
             credentials: Optional dictionary with username/password for basic auth
             
         Returns:
@@ -55,8 +220,7 @@ class WebScraper:
             logger.info(f"Scraping URL: {url}")
             
             # Validate URL
-            parsed_url = urlparse(url)
-            if not parsed_url.scheme or not parsed_url.netloc:
+            if not _URL_RE.match(url):
                 return {"success": False, "error": f"Invalid URL: {url}"}
             
             # Handle authentication if provided
@@ -64,60 +228,10 @@ class WebScraper:
             if credentials and "username" in credentials and "password" in credentials:
                 auth = (credentials["username"], credentials["password"])
             
-            # Make the request
-            response = self.session.get(url, auth=auth, timeout=30)
-            response.raise_for_status()
-            
-            # Process the content
-            content_type = response.headers.get("Content-Type", "")
-            
-            if "text/html" in content_type and BS4_AVAILABLE:
-                # Parse HTML
-                soup = BeautifulSoup(response.text, "html.parser")
-                
-                # Extract title
-                title = soup.title.string if soup.title else "No title"
-                
-                # Extract main content
-                if selector:
-                    # Use selector if provided
-                    selected_elements = soup.select(selector)
-                    if selected_elements:
-                        content = "\n".join(el.get_text(strip=True) for el in selected_elements)
-                    else:
-                        content = "No content found with the provided selector"
-                else:
-                    # Simple extraction of main content
-                    for tag in soup(["script", "style", "meta", "link"]):
-                        tag.extract()
-                    content = soup.get_text(separator="\n", strip=True)
-                
-                return {
-                    "success": True,
-                    "url": url,
-                    "title": title,
-                    "content": content[:5000] + "..." if len(content) > 5000 else content,
-                    "content_type": "html"
-                }
-                
-            elif "application/json" in content_type:
-                # Process JSON
-                json_data = response.json()
-                return {
-                    "success": True,
-                    "url": url,
-                    "content": json.dumps(json_data, indent=2)[:5000] + "..." if len(json.dumps(json_data)) > 5000 else json.dumps(json_data, indent=2),
-                    "content_type": "json"
-                }
-                
-            else:
-                # Return raw content for other types
-                return {
-                    "success": True,
-                    "url": url,
-                    "content": response.text[:5000] + "..." if len(response.text) > 5000 else response.text,
-                    "content_type": content_type
-                }
+            # Make the request, streaming the body so only as much as needed is downloaded
+            with self.session.get(url, auth=auth, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                return self._process_response(url, response, selector)
                 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error scraping URL {url}: {str(e)}")
@@ -133,6 +247,126 @@ class WebScraper:
                 "url": url,
                 "error": f"Unexpected error: {str(e)}"
             }
+    
+    def scrape_many(self, urls: List[str], selector: Optional[str] = None, max_workers: int = 16) -> List[Dict[str, Any]]:
+        """
+        Scrape several URLs concurrently
+        
+        Requests share the session's connection pool, so the total time is close to
+        that of the slowest URL rather than the sum of all of them.
+        
+        Args:
+            urls: The URLs to scrape
+            selector: Optional CSS selector to extract specific content
+            max_workers: Maximum number of URLs fetched at the same time
+            
+        Returns:
+            List of scrape results, in the same order as the URLs
+        """
+        if not urls:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+            return list(executor.map(lambda url: self.scrape(url, selector=selector), urls))
+    
+    def _process_response(self, url: str, response: requests.Response, selector: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Extract the content of a scraped response
+        
+        Args:
+            url: The scraped URL
+            response: The streamed response
+            selector: Optional CSS selector to extract specific content
+            
+        Returns:
+            Dictionary with scraped content
+        """
+        content_type = response.headers.get("Content-Type", "")
+        
+        if "text/html" in content_type and LXML_AVAILABLE and not selector:
+            # Plain text extraction streams through lxml without building a DOM,
+            # and stops downloading once enough text has been extracted
+            encoding = response.encoding if "charset" in content_type.lower() else None
+            title, content = self._extract_text(
+                response.iter_content(chunk_size=8192),
+                encoding,
+                max_chars=_MAX_CONTENT_CHARS
+            )
+            
+            return {
+                "success": True,
+                "url": url,
+                "title": title or "No title",
+                "content": content[:_MAX_CONTENT_CHARS] + "..." if len(content) > _MAX_CONTENT_CHARS else content,
+                "content_type": "html"
+            }
+            
+        elif "text/html" in content_type and BS4_AVAILABLE:
+            # Parse HTML from the raw bytes so the parser can sniff the encoding itself
+            strainer = self._strainer_for(selector) if selector else None
+            if strainer is not None:
+                soup = BeautifulSoup(response.content, _HTML_PARSER, parse_only=strainer)
+                head = BeautifulSoup(response.content, _HTML_PARSER, parse_only=SoupStrainer("title"))
+            else:
+                soup = head = BeautifulSoup(response.content, _HTML_PARSER)
+            
+            # Extract title
+            title = head.title.string if head.title else "No title"
+            
+            # Extract main content
+            if selector:
+                # Use selector if provided
+                selected_elements = soup.select(selector)
+                if selected_elements:
+                    content = "\n".join(el.get_text(strip=True) for el in selected_elements)
+                else:
+                    content = "No content found with the provided selector"
+            else:
+                # Simple extraction of main content
+                for tag in soup(["script", "style", "meta", "link"]):
+                    tag.extract()
+                content = soup.get_text(separator="\n", strip=True)
+            
+            return {
+                "success": True,
+                "url": url,
+                "title": title,
+                "content": content[:_MAX_CONTENT_CHARS] + "..." if len(content) > _MAX_CONTENT_CHARS else content,
+                "content_type": "html"
+            }
+            
+        elif "application/json" in content_type:
+            # Process JSON, unless the body is too large to parse in full
+            body = self._read_limited(response, _MAX_JSON_BYTES + 1)
+            if len(body) > _MAX_JSON_BYTES:
+                text = body[:(_MAX_CONTENT_CHARS + 1) * 4].decode(response.encoding or "utf-8", errors="replace")
+                return {
+                    "success": True,
+                    "url": url,
+                    "content": text[:_MAX_CONTENT_CHARS] + "...",
+                    "content_type": "json"
+                }
+            
+            json_data = json.loads(body)
+            dumped = json.dumps(json_data, indent=2)
+            return {
+                "success": True,
+                "url": url,
+                "content": dumped[:_MAX_CONTENT_CHARS] + "..." if len(dumped) > _MAX_CONTENT_CHARS else dumped,
+                "content_type": "json"
+            }
+            
+        else:
+            # Return raw content for other types, reading only enough bytes for the
+            # truncated text (a character is at most 4 bytes)
+            body = self._read_limited(response, (_MAX_CONTENT_CHARS + 1) * 4)
+            text = body.decode(response.encoding or "utf-8", errors="replace")
+            return {
+                "success": True,
+                "url": url,
+                "content": text[:_MAX_CONTENT_CHARS] + "..." if len(text) > _MAX_CONTENT_CHARS else text,
+                "content_type": content_type
+            }
 
 
 class ShellExecutor:
@@ -147,13 +381,21 @@ class ShellExecutor:
             blocked_commands: List of blocked shell commands
             enable_sandbox: Whether to use Docker sandboxing for command execution
         """
-        self.allowed_commands = allowed_commands or ["ls", "cat", "pwd", "echo", "grep", "find"]
-        self.blocked_commands = blocked_commands or ["rm", "mkfs", "dd", ">", "format"]
+        self.allowed_commands = frozenset(allowed_commands or ("ls", "cat", "pwd", "echo", "grep", "find"))
+        self.blocked_commands = frozenset(blocked_commands or ("rm", "mkfs", "dd", ">", "format"))
         self.enable_sandbox = enable_sandbox and DOCKER_AVAILABLE
+        self._sandbox = None
+        self._sandbox_lock = threading.Lock()
+        
+        # Blocked patterns match anywhere in a command, so check them all with one regex
+        self._blocked_re = re.compile(
+            "|".join(map(re.escape, sorted(self.blocked_commands)))
+        ) if self.blocked_commands else None
         
         if self.enable_sandbox:
             try:
                 self.docker_client = docker.from_env()
+                atexit.register(self._stop_sandbox)
                 logger.info("Docker sandbox enabled for shell command execution")
             except Exception as e:
                 logger.warning(f"Failed to initialize Docker client: {str(e)}")
@@ -179,10 +421,10 @@ class ShellExecutor:
         base_command = command_parts[0]
         
         # Check if the command is in the block list
-        for blocked in self.blocked_commands:
-            if blocked in command:
-                logger.warning(f"Command contains blocked pattern: {blocked}")
-                return False
+        blocked = self._blocked_re.search(command) if self._blocked_re else None
+        if blocked:
+            logger.warning(f"Command contains blocked pattern: {blocked.group(0)}")
+            return False
         
         # Check if the command is in the allow list
         if self.allowed_commands:
@@ -238,37 +480,106 @@ class ShellExecutor:
             Command execution results
         """
         try:
-            # Execute the command with a timeout
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            
-            stdout = result.stdout
-            stderr = result.stderr
-            
+            # Run the program directly rather than through /bin/sh, which also rules out
+            # redirection, pipes and command chaining
+            argv = shlex.split(command)
+        except ValueError as e:
             return {
-                "success": result.returncode == 0,
+                "success": False,
                 "command": command,
-                "stdout": stdout,
-                "stderr": stderr,
-                "returncode": result.returncode
+                "error": f"Could not parse command: {str(e)}"
             }
-            
-        except subprocess.TimeoutExpired:
+        
+        if not argv or (self.allowed_commands and argv[0] not in self.allowed_commands):
+            return {
+                "success": False,
+                "command": command,
+                "error": "This command is not allowed for security reasons."
+            }
+        
+        # Run the command in its own process group so a timeout kills any children it spawned too
+        process = subprocess.Popen(
+            argv,
+            shell=False,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True
+        )
+        timed_out = threading.Event()
+        
+        def kill():
+            timed_out.set()
+            try:
+                if hasattr(os, "killpg"):
+                    os.killpg(process.pid, signal.SIGKILL)
+                else:
+                    process.kill()
+            except ProcessLookupError:
+                pass
+        
+        timer = threading.Timer(60, kill)
+        timer.start()
+        try:
+            stdout, stderr = process.communicate()
+        finally:
+            timer.cancel()
+        
+        if timed_out.is_set():
             return {
                 "success": False,
                 "command": command,
                 "error": "Command execution timed out after 60 seconds"
             }
+        
+        return {
+            "success": process.returncode == 0,
+            "command": command,
+            "stdout": stdout,
+            "stderr": stderr,
+            "returncode": process.returncode
+        }
+    
+    def _get_sandbox(self):
+        """
+        Get the long-lived sandbox container, starting it on first use
+        
+        Returns:
+            The running Docker container
+        """
+        with self._sandbox_lock:
+            if self._sandbox is None:
+                self._sandbox = self.docker_client.containers.run(
+                    "alpine:latest",
+                    ["sleep", "infinity"],
+                    detach=True,
+                    auto_remove=True,
+                    network_disabled=True,
+                    mem_limit="256m",
+                    pids_limit=64,
+                    read_only=True,
+                    tmpfs={"/tmp": ""}
+                )
+                logger.info(f"Started sandbox container {self._sandbox.short_id}")
+            return self._sandbox
+    
+    def _stop_sandbox(self):
+        """Kill the sandbox container if it is running"""
+        with self._sandbox_lock:
+            sandbox, self._sandbox = self._sandbox, None
+        if sandbox is not None:
+            try:
+                sandbox.kill()
+            except Exception as e:
+                logger.warning(f"Failed to stop sandbox container: {str(e)}")
     
     def _run_sandboxed(self, command: str) -> Dict[str, Any]:
         """
         Run a command in a Docker sandbox
         
+        Commands are executed in one container that is kept running between calls,
+        avoiding the cost of creating and removing a container per command.
+        
         Args:
             command: Command to execute
             
@@ -276,61 +587,33 @@ class ShellExecutor:
             Command execution results
         """
         try:
-            # Create a temporary script file
-            with tempfile.NamedTemporaryFile(mode='w+', suffix='.sh', delete=False) as script_file:
-                script_file.write(f"#!/bin/sh\n{command}")
-                script_path = script_file.name
-            
-            # Make the script executable
-            os.chmod(script_path, 0o755)
-            
-            # Run the command in a Docker container
-            container = self.docker_client.containers.run(
-                "alpine:latest",
-                ["/bin/sh", "-c", command],
-                remove=True,
-                detach=False,
+            # Use the low-level exec API directly; busybox timeout enforces the same limit as local execution
+            api = self.docker_client.api
+            exec_id = api.exec_create(
+                self._get_sandbox().id,
+                ["timeout", "60", "/bin/sh", "-c", command],
                 stdout=True,
-                stderr=True,
-                timeout=60,
-                volumes={
-                    os.path.dirname(script_path): {
-                        'bind': '/mnt',
-                        'mode': 'ro'
-                    }
-                }
-            )
+                stderr=True
+            )["Id"]
+            stdout, stderr = api.exec_start(exec_id, demux=True)
+            exit_code = api.exec_inspect(exec_id)["ExitCode"]
             
-            # Parse the output
-            try:
-                output = container.decode('utf-8')
-                return {
-                    "success": True,
-                    "command": command,
-                    "stdout": output,
-                    "stderr": "",
-                    "returncode": 0
-                }
-            except Exception:
-                return {
-                    "success": False,
-                    "command": command,
-                    "error": "Failed to decode container output"
-                }
+            return {
+                "success": exit_code == 0,
+                "command": command,
+                "stdout": (stdout or b"").decode("utf-8", errors="replace"),
+                "stderr": (stderr or b"").decode("utf-8", errors="replace"),
+                "returncode": exit_code
+            }
                 
         except Exception as e:
+            # The container may have died; start a fresh one on the next call
+            self._stop_sandbox()
             return {
                 "success": False,
                 "command": command,
                 "error": f"Error in Docker execution: {str(e)}"
             }
-        finally:
-            # Clean up temporary script
-            if 'script_path' in locals():
-                try:
-                    os.unlink(script_path)
-                except Exception:
-                    pass
 
 
 class FileManager:
@@ -344,6 +627,10 @@ class FileManager:
             working_dir: Optional working directory (defaults to current directory)
         """
         self.working_dir = working_dir or os.getcwd()
+        
+        # Resolved once so path checks are a prefix comparison against the real directory
+        self._root = os.path.realpath(self.working_dir)
+        self._root_prefix = os.path.join(self._root, "")
         logger.info(f"File manager initialized with working directory: {self.working_dir}")
     
     def manage_file(self, action: str, path: str, content: Optional[str] = None) -> Dict[str, Any]:
@@ -361,11 +648,11 @@ class FileManager:
         try:
             logger.info(f"File operation: {action} on {path}")
             
-            # Resolve the full path
-            full_path = os.path.join(self.working_dir, path)
+            # Resolve the full path, following symlinks so they can't point outside the working directory
+            full_path = os.path.realpath(os.path.join(self._root, path))
             
             # Make sure the path is within the working directory
-            if not os.path.normpath(full_path).startswith(os.path.normpath(self.working_dir)):
+            if full_path != self._root and not full_path.startswith(self._root_prefix):
                 return {
                     "success": False,
                     "path": path,
@@ -391,9 +678,15 @@ class FileManager:
                         "contents": contents
                     }
                 else:
-                    # Read file contents
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        file_content = f.read()
+                    # Read file contents; large files are mapped and decoded in one pass
+                    # instead of being copied through the text layer's buffers, with newlines
+                    # translated the way text mode does for small files
+                    if os.path.getsize(full_path) > _MMAP_THRESHOLD:
+                        with open(full_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                            file_content = str(mapped, "utf-8").replace("\r\n", "\n").replace("\r", "\n")
+                    else:
+                        with open(full_path, "r", encoding="utf-8") as f:
+                            file_content = f.read()
                     return {
                         "success": True,
                         "path": path,
@@ -442,8 +735,21 @@ class FileManager:
                         "error": "Cannot delete directories"
                     }
                 else:
-                    # Delete the file
-                    os.unlink(full_path)
+                    # Delete the entry itself rather than full_path, so a symlink is removed
+                    # instead of the file it points to; its directory must be inside too
+                    joined_path = os.path.join(self._root, path)
+                    link_path = os.path.join(
+                        os.path.realpath(os.path.dirname(joined_path)),
+                        os.path.basename(joined_path)
+                    )
+                    if not link_path.startswith(self._root_prefix):
+                        return {
+                            "success": False,
+                            "path": path,
+                            "error": "Path is outside the working directory"
+                        }
+                    
+                    os.unlink(link_path)
                     return {
                         "success": True,
                         "path": path,
@@ -465,17 +771,18 @@ class FileManager:
                         "error": "Path is not a directory"
                     }
                     
-                # List directory contents with details
+                # List directory contents with details; scandir gets the entry types from the
+                # directory listing itself, so each entry needs at most one stat call
                 contents = []
-                for item in os.listdir(full_path):
-                    item_path = os.path.join(full_path, item)
-                    stat = os.stat(item_path)
-                    contents.append({
-                        "name": item,
-                        "is_directory": os.path.isdir(item_path),
-                        "size": stat.st_size,
-                        "modified": stat.st_mtime
-                    })
+                with os.scandir(full_path) as entries:
+                    for entry in entries:
+                        stat = entry.stat(follow_symlinks=False)
+                        contents.append({
+                            "name": entry.name,
+                            "is_directory": entry.is_dir(follow_symlinks=False),
+                            "size": stat.st_size,
+                            "modified": stat.st_mtime
+                        })
                     
                 return {
                     "success": True,
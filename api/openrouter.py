@@ -6,50 +6,134 @@ This module handles interactions with the OpenRouter API for accessing various L
 
 import os
 import json
+import asyncio
 import logging
 import requests
-from typing import Dict, Any, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional, Iterator, AsyncIterator, Union
+
+# Optional imports
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# JSON codec for request and response bodies: orjson when installed, the stdlib otherwise
+if ORJSON_AVAILABLE:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+# (connect, read) timeouts in seconds; the read timeout applies between received chunks
+REQUEST_TIMEOUT = (5, 120)
+
 class OpenRouterAPI:
     """Client for interacting with OpenRouter API to access various LLMs"""
     
     BASE_URL = "https://openrouter.ai/api/v1"
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, default_model: Optional[str] = None):
         """
         Initialize the OpenRouter API client
         
         Args:
             api_key: OpenRouter API key
+            default_model: Model to use when a request doesn't name one (defaults to
+                the DEFAULT_MODEL environment variable)
         """
         self.api_key = api_key
-        self.default_model = os.getenv("DEFAULT_MODEL", "claude-3-sonnet-20240229")
+        self.default_model = default_model or os.getenv("DEFAULT_MODEL", "claude-3-sonnet-20240229")
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://manus-ai-agent.example.com"  # Replace with your domain
+        }
+        
+        # Reuse keep-alive connections across requests instead of a new TCP+TLS handshake per call
+        self.session = requests.Session()
+        self.session.headers.update(self.get_headers())
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            # Retry throttling and gateway errors, but never a read timeout: the request may
+            # already be generating (and billed), so resending it would duplicate the work
+            max_retries=Retry(
+                total=3,
+                read=0,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset({"GET", "POST"})
+            )
+        ))
+        
+        # Validators and parsed body of the last model list response, for conditional requests
+        self._models_cache = {"etag": None, "last_modified": None, "data": None}
         logger.info(f"OpenRouter API client initialized with default model: {self.default_model}")
     
+    def close(self):
+        """Close the pooled connections of the HTTP session"""
+        self.session.close()
+    
     def get_headers(self) -> Dict[str, str]:
         """
-        Generate headers for OpenRouter API requests
+        Get the headers for OpenRouter API requests
+        
+        The headers are built once in __init__ and are also set on the session,
+        so requests made through it don't need to pass them.
         
         Returns:
             Dictionary of headers
         """
-        return {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://manus-ai-agent.example.com"  # Replace with your domain
+        return self._headers
+    
+    def _build_payload(
+        self,
+        model: str,
+        prompt: Optional[str],
+        messages: Optional[List[Dict[str, Any]]],
+        max_tokens: int,
+        temperature: float,
+        top_p: float,
+        stop_sequences: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        """
+        Build the request body for a chat completion
+        
+        Returns:
+            Dictionary payload for the chat completions endpoint
+        """
+        payload = {
+            "model": model,
+            "messages": messages or [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p
         }
+        
+        if stop_sequences:
+            payload["stop"] = stop_sequences
+        
+        return payload
     
     def generate_completion(
         self, 
-        prompt: str, 
+        prompt: Optional[str] = None, 
         model: Optional[str] = None,
         max_tokens: int = 1024,
         temperature: float = 0.7,
         top_p: float = 0.9,
-        stop_sequences: Optional[List[str]] = None
-    ) -> Dict[str, Any]:
+        stop_sequences: Optional[List[str]] = None,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        stream: bool = False
+    ) -> Union[Dict[str, Any], Iterator[str]]:
         """
         Generate a completion response from the specified model
         
@@ -60,36 +144,32 @@ class OpenRouterAPI:
             temperature: Sampling temperature (higher = more creative, lower = more deterministic)
             top_p: Nucleus sampling parameter
             stop_sequences: Optional list of sequences that will stop generation if encountered
+            messages: Optional chat messages to send instead of a single user prompt
+            stream: Whether to stream the completion as it is generated
             
         Returns:
-            The completion response
+            The completion response, or an iterator over chunks of completion text when streaming
         """
+        if stream:
+            return self._iter_stream(prompt, model, max_tokens, temperature, top_p, stop_sequences, messages)
+        
         model_to_use = model or self.default_model
-        logger.info(f"Generating completion with model: {model_to_use}")
+        logger.info("Generating completion with model: %s", model_to_use)
         
         url = f"{self.BASE_URL}/chat/completions"
-        headers = self.get_headers()
-        
-        payload = {
-            "model": model_to_use,
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            "top_p": top_p
-        }
-        
-        if stop_sequences:
-            payload["stop"] = stop_sequences
+        payload = self._build_payload(model_to_use, prompt, messages, max_tokens, temperature, top_p, stop_sequences)
         
         try:
-            logger.debug(f"Sending request to OpenRouter API: {json.dumps(payload)}")
-            response = requests.post(url, headers=headers, json=payload)
+            # Serializing the whole prompt is only worth it when debug logging is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sending request to OpenRouter API: %s", json.dumps(payload))
+            response = self.session.post(url, data=_json_dumps(payload), timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            completion_data = response.json()
+            completion_data = _json_loads(response.content)
             
             # Extract the completion text
             completion = completion_data.get("choices", [{}])[0].get("message", {}).get("content", "")
-            logger.info(f"Successfully received completion from OpenRouter API")
+            logger.info("Successfully received completion from OpenRouter API")
             
             return {
                 "completion": completion,
@@ -97,7 +177,7 @@ class OpenRouterAPI:
                 "raw_response": completion_data
             }
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"Error making request to OpenRouter API: {str(e)}")
             return {
                 "error": str(e),
@@ -105,6 +185,100 @@ class OpenRouterAPI:
                 "model": model_to_use
             }
     
+    async def agenerate_completion(self, **kwargs) -> Dict[str, Any]:
+        """
+        Generate a completion without blocking the event loop
+        
+        The request runs in a worker thread so that concurrent coroutines (e.g. parallel
+        plan steps) keep making progress while waiting on the API.
+        
+        Args:
+            **kwargs: Arguments accepted by generate_completion
+            
+        Returns:
+            The completion response
+        """
+        return await asyncio.to_thread(self.generate_completion, **kwargs)
+    
+    def _iter_stream(
+        self,
+        prompt: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        stop_sequences: Optional[List[str]] = None,
+        messages: Optional[List[Dict[str, Any]]] = None
+    ) -> Iterator[str]:
+        """
+        Stream a completion as server-sent events, yielding text deltas as they arrive
+        
+        Takes the same arguments as generate_completion. Malformed chunks are skipped;
+        request errors are logged and re-raised.
+        
+        Yields:
+            Chunks of completion text
+        """
+        model_to_use = model or self.default_model
+        logger.info("Streaming completion with model: %s", model_to_use)
+        
+        url = f"{self.BASE_URL}/chat/completions"
+        payload = self._build_payload(model_to_use, prompt, messages, max_tokens, temperature, top_p, stop_sequences)
+        payload["stream"] = True
+        
+        try:
+            with self.session.post(url, data=_json_dumps(payload), stream=True, timeout=REQUEST_TIMEOUT) as response:
+                response.raise_for_status()
+                response.encoding = "utf-8"
+                
+                for line in response.iter_lines(decode_unicode=True):
+                    # Skip keep-alive comments and other non-data lines
+                    if not line or not line.startswith("data: "):
+                        continue
+                    
+                    data = line[len("data: "):]
+                    if data == "[DONE]":
+                        break
+                    
+                    try:
+                        chunk = _json_loads(data)
+                    except ValueError:
+                        logger.warning("Skipping malformed stream chunk: %.200s", data)
+                        continue
+                    
+                    # Usage and keep-alive chunks have no choices
+                    choices = chunk.get("choices") if isinstance(chunk, dict) else None
+                    if not choices:
+                        continue
+                    
+                    content = (choices[0].get("delta") or {}).get("content")
+                    if content:
+                        yield content
+                        
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error streaming from OpenRouter API: {str(e)}")
+            raise
+    
+    async def astream_completion(self, **kwargs) -> AsyncIterator[str]:
+        """
+        Stream a completion without blocking the event loop
+        
+        Args:
+            **kwargs: Arguments accepted by generate_completion
+            
+        Yields:
+            Chunks of completion text
+            
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+        """
+        chunks = self._iter_stream(**kwargs)
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    
     def get_available_models(self) -> List[Dict[str, Any]]:
         """
         Fetch the list of available models from OpenRouter
@@ -113,16 +287,32 @@ class OpenRouterAPI:
             List of available models with their details
         """
         url = f"{self.BASE_URL}/models"
-        headers = self.get_headers()
+        cache = self._models_cache
+        
+        # Ask the server to skip the body if the model list hasn't changed since the last call
+        headers = {}
+        if cache["data"] is not None:
+            if cache["etag"]:
+                headers["If-None-Match"] = cache["etag"]
+            if cache["last_modified"]:
+                headers["If-Modified-Since"] = cache["last_modified"]
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            if response.status_code == 304:
+                logger.info(f"Model list unchanged, reusing {len(cache['data'])} cached models")
+                return cache["data"]
+            
             response.raise_for_status()
-            models_data = response.json()
+            models_data = _json_loads(response.content)
             
-            logger.info(f"Successfully retrieved {len(models_data.get('data', []))} models from OpenRouter API")
-            return models_data.get("data", [])
+            cache["etag"] = response.headers.get("ETag")
+            cache["last_modified"] = response.headers.get("Last-Modified")
+            cache["data"] = models_data.get("data", [])
             
-        except requests.exceptions.RequestException as e:
+            logger.info(f"Successfully retrieved {len(cache['data'])} models from OpenRouter API")
+            return cache["data"]
+            
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"Error fetching available models from OpenRouter API: {str(e)}")
             return [] 
\ No newline at end of file
@@ -4,6 +4,12 @@ Configuration Module for Manus AI Agent
 This module handles loading and managing application settings.
 """
 
-from .settings import Settings, load_settings, save_settings
+from .settings import (
+    Settings, load_settings, save_settings, invalidate_settings_cache,
+    save_gui_settings, clear_gui_settings
+)
 
-__all__ = ['Settings', 'load_settings', 'save_settings'] 
\ No newline at end of file
+__all__ = [
+    'Settings', 'load_settings', 'save_settings', 'invalidate_settings_cache',
+    'save_gui_settings', 'clear_gui_settings'
+] 
\ No newline at end of file
@@ -7,11 +7,31 @@ Handles loading and managing application configuration.
 import os
 import json
 import logging
+import functools
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
 
+# Optional imports
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Organization and application name of the settings saved from the GUI. QSettings is
+# imported where it's used, so importing this module doesn't require Qt.
+QSETTINGS_SCOPE = ("manus", "agent")
+
+# Settings fields saved from the GUI, keyed by their QSettings key, with their value types
+_QSETTINGS_FIELDS = {
+    "api_key": ("openrouter_api_key", str),
+    "default_model": ("default_model", str),
+    "enable_sandbox": ("enable_sandbox", bool),
+    "max_execution_time": ("max_execution_time", int)
+}
+
 class Settings(BaseModel):
     """Settings model for the application"""
     
@@ -33,6 +53,17 @@ class Settings(BaseModel):
     execution_temperature: float = 0.7
     max_planning_tokens: int = 2048
     max_execution_tokens: int = 4096
+    context_window: int = 200000  # model context window in tokens
+    context_window_steps: int = 3  # previous step summaries passed verbatim
+    context_retrieval_k: int = 3  # older step summaries retrieved by relevance
+    max_context_tokens: int = 1024  # cap on previous-step context per prompt
+    stream_completions: bool = True
+    task_history_size: int = 64
+    execute_tools: bool = False  # run detected tool calls instead of simulating them
+    response_cache_size: int = 1024
+    response_cache_ttl: int = 3600  # seconds
+    enable_plan_cache: bool = False  # reuse plans of tasks that differ only in URLs/quoted values
+    plan_cache_path: Optional[str] = os.path.join(os.path.dirname(__file__), "plan_cache.json")
     
     # Advanced settings
     allowed_commands: list = ["ls", "cat", "pwd", "echo", "grep", "find"]
@@ -42,6 +73,24 @@ def load_settings() -> Settings:
     """
     Load settings from environment variables and config files
     
+    The environment and config file are only read once per process; call
+    invalidate_settings_cache() after changing either to pick up the changes.
+    
+    Returns:
+        Settings object with loaded configuration
+    """
+    # Hand out a copy so callers can modify their settings without touching the cached ones
+    return _load_settings_cached().model_copy(deep=True)
+
+def invalidate_settings_cache():
+    """Discard the cached settings so the next load_settings() call reads them again"""
+    _load_settings_cached.cache_clear()
+
+@functools.lru_cache(maxsize=1)
+def _load_settings_cached() -> Settings:
+    """
+    Read settings from environment variables and config files
+    
     Returns:
         Settings object with loaded configuration
     """
@@ -60,14 +109,26 @@ def load_settings() -> Settings:
     config_path = os.path.join(os.path.dirname(__file__), "config.json")
     if os.path.exists(config_path):
         try:
-            with open(config_path, "r") as f:
-                config_data = json.load(f)
-                # Update settings with config file values
-                settings_dict.update(config_data)
-                logger.info(f"Loaded configuration from {config_path}")
+            with open(config_path, "rb") as f:
+                data = f.read()
+            config_data = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+            # Update settings with config file values
+            settings_dict.update(config_data)
+            logger.info(f"Loaded configuration from {config_path}")
         except Exception as e:
             logger.error(f"Error loading config file {config_path}: {str(e)}")
     
+    # Settings saved from the GUI take precedence over the environment and config file
+    try:
+        from PyQt5.QtCore import QSettings
+    except ImportError:
+        QSettings = None
+    if QSettings is not None:
+        qsettings = QSettings(*QSETTINGS_SCOPE)
+        for key, (field, value_type) in _QSETTINGS_FIELDS.items():
+            if qsettings.contains(key):
+                settings_dict[field] = qsettings.value(key, type=value_type)
+    
     # Create and return settings object
     settings = Settings(**settings_dict)
     return settings
@@ -88,11 +149,52 @@ def save_settings(settings: Settings) -> bool:
         settings_dict = settings.dict(exclude_none=True)
         
         # Write to config file
-        with open(config_path, "w") as f:
-            json.dump(settings_dict, f, indent=2)
+        if ORJSON_AVAILABLE:
+            data = orjson.dumps(settings_dict, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(settings_dict, indent=2).encode("utf-8")
+        with open(config_path, "wb") as f:
+            f.write(data)
         
+        invalidate_settings_cache()
         logger.info(f"Saved configuration to {config_path}")
         return True
     except Exception as e:
         logger.error(f"Error saving config file {config_path}: {str(e)}")
-        return False 
\ No newline at end of file
+        return False 
+
+def save_gui_settings(settings: Settings) -> bool:
+    """
+    Save the settings edited in the GUI to the native Qt settings store
+    
+    Args:
+        settings: Settings object to save
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        from PyQt5.QtCore import QSettings
+    except ImportError:
+        return False
+    
+    qsettings = QSettings(*QSETTINGS_SCOPE)
+    for key, (field, _) in _QSETTINGS_FIELDS.items():
+        qsettings.setValue(key, getattr(settings, field))
+    qsettings.sync()
+    
+    invalidate_settings_cache()
+    return qsettings.status() == QSettings.NoError
+
+def clear_gui_settings():
+    """Remove the settings saved from the GUI so the environment and config file apply again"""
+    try:
+        from PyQt5.QtCore import QSettings
+    except ImportError:
+        QSettings = None
+    if QSettings is not None:
+        qsettings = QSettings(*QSETTINGS_SCOPE)
+        for key in _QSETTINGS_FIELDS:
+            qsettings.remove(key)
+        qsettings.sync()
+    invalidate_settings_cache()
\ No newline at end of file
@@ -6,107 +6,573 @@ This script helps set up and deploy the Manus AI Agent on a VPS.
 """
 
 import os
+import re
 import sys
+import shlex
+import hashlib
+import collections
 import argparse
-import subprocess
-import shutil
 import logging
+import sysconfig
 from pathlib import Path
 
-# Set up logging
+# subprocess, shutil, tarfile, tempfile and importlib.metadata are imported in the
+# functions that use them, so `--help` and short runs don't pay for them at startup
+
+# Optional imports
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+class _BufferedFileHandler(logging.FileHandler):
+    """File handler that writes through a 64 KiB buffer instead of flushing every record"""
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=65536, encoding=self.encoding, errors=self.errors)
+    
+    def emit(self, record):
+        super().emit(record)
+        # Get errors onto disk right away in case the process is killed
+        if record.levelno >= logging.ERROR and self.stream is not None:
+            self.stream.flush()
+    
+    def flush(self):
+        # The buffer is written out when it fills, on errors and when the handler is
+        # closed by logging.shutdown() at exit
+        pass
+
+# Set up logging; the log file is only created once something is logged to it
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(),
-        logging.FileHandler("deploy.log")
+        _BufferedFileHandler("deploy.log", delay=True)
     ]
 )
 logger = logging.getLogger("deploy")
 
+# Directory containing this script and the project files
+HERE = Path(__file__).resolve().parent
+
+# Per-user cache for pip downloads and the fingerprint of the last installed requirements;
+# the marker is kept per interpreter and environment, so a fresh venv still runs pip
+CACHE_DIR = Path.home() / ".cache" / "manus-agent"
+PIP_CACHE_DIR = CACHE_DIR / "pip"
+_ENV_KEY = hashlib.sha1(f"{sys.executable}|{sys.prefix}".encode("utf-8")).hexdigest()[:16]
+REQUIREMENTS_MARKER = CACHE_DIR / f"reqs-{_ENV_KEY}.sha256"
+
+# How long a successful dependency check is trusted, in seconds
+DEPS_CHECK_TTL = 24 * 60 * 60
+
+# Snapshots of installed packages, restored instead of running pip when requirements haven't changed
+SNAPSHOT_DIR = HERE / "deploy_cache"
+_SNAPSHOT_MANIFEST = "manifest"
+_SNAPSHOT_EXCLUDE = frozenset({"pip", "setuptools", "wheel"})
+
+# systemd unit for running the agent, filled in by setup_systemd_service()
+_SYSTEMD_TEMPLATE = """[Unit]
+Description=Manus AI Agent
+After=network.target
+
+[Service]
+User={username}
+WorkingDirectory={project_path}
+ExecStart={python} {project_path}/main.py
+Restart=always
+RestartSec=10
+Environment=PYTHONUNBUFFERED=1
+
+[Install]
+WantedBy=multi-user.target
+"""
+
+class _Lazy:
+    """Log argument that calls a function to build its text only when the record is formatted"""
+    
+    def __init__(self, func):
+        self.func = func
+    
+    def __str__(self):
+        return self.func()
+
 def run_command(command, shell=False):
     """
     Run a shell command and log the output
     
+    Output is logged line by line as the command produces it, with stderr merged
+    into stdout.
+    
     Args:
         command: Command to run (list or string)
         shell: Whether to use shell execution
         
     Returns:
-        Command output
+        Command output (the last 200 lines)
     """
-    logger.info(f"Running command: {command if isinstance(command, str) else ' '.join(command)}")
+    import subprocess
     
-    try:
-        result = subprocess.run(
-            command,
-            shell=shell,
-            check=True,
-            text=True,
-            capture_output=True
-        )
-        
-        if result.stdout:
-            logger.info(f"Command output: {result.stdout.strip()}")
-        
-        return result.stdout.strip()
-        
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Command failed with exit code {e.returncode}")
-        if e.stdout:
-            logger.error(f"Command output: {e.stdout.strip()}")
-        if e.stderr:
-            logger.error(f"Command error: {e.stderr.strip()}")
-        raise
+    logger.info("Running command: %s", _Lazy(lambda: command if isinstance(command, str) else shlex.join(command)))
+    
+    # Only the tail of the output is kept for the return value and error
+    tail = collections.deque(maxlen=200)
+    
+    with subprocess.Popen(
+        command,
+        shell=shell,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1
+    ) as process:
+        for line in process.stdout:
+            line = line.rstrip()
+            logger.info("Command output: %s", line)
+            tail.append(line)
+        returncode = process.wait()
+    
+    output = "\n".join(tail).strip()
+    if returncode != 0:
+        logger.error(f"Command failed with exit code {returncode}")
+        raise subprocess.CalledProcessError(returncode, command, output=output)
+    
+    return output
 
-def check_dependencies():
+def check_dependencies(force=False):
     """
     Check if all required dependencies are installed
+    
+    A successful check is remembered for a day per interpreter and platform, and
+    the tool probes are skipped while it is fresh.
+    
+    Args:
+        force: Whether to run the checks even if they passed recently
     """
+    import platform
+    import time
+    from importlib.metadata import version, PackageNotFoundError
+    
     logger.info("Checking dependencies...")
     
     # Check Python version
     python_version = sys.version_info
     logger.info(f"Python version: {python_version.major}.{python_version.minor}.{python_version.micro}")
     
-    if python_version.major < 3 or (python_version.major == 3 and python_version.minor < 9):
+    if python_version < (3, 9):
         logger.error("Python 3.9 or higher is required")
         sys.exit(1)
     
-    # Check if pip is installed
+    key = hashlib.sha1(f"{sys.executable}|{platform.platform()}".encode("utf-8")).hexdigest()[:16]
+    marker = CACHE_DIR / f"deps_ok-{key}"
+    if not force:
+        try:
+            if time.time() - os.stat(marker).st_mtime < DEPS_CHECK_TTL:
+                logger.info("Dependencies were checked recently, skipping (use --force-check to recheck)")
+                return
+        except OSError:
+            pass
+    
+    # Check if pip is installed for this interpreter; packages are installed with `python -m pip`
     try:
-        run_command(["pip", "--version"])
-    except Exception:
-        logger.error("pip is not installed or not in PATH")
+        logger.info(f"pip: {version('pip')}")
+    except PackageNotFoundError:
+        logger.error("pip is not installed for this Python interpreter")
         sys.exit(1)
     
     # Check if Docker is installed (optional)
-    try:
-        run_command(["docker", "--version"])
+    _, docker_ok, output = _probe("docker", ["docker", "--version"])
+    if docker_ok:
+        logger.info(f"docker: {output}")
         logger.info("Docker is installed, sandbox mode will be available")
-    except Exception:
+    else:
         logger.warning("Docker is not installed or not in PATH, sandbox mode will not be available")
     
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    marker.touch()
+    
     logger.info("All required dependencies are installed")
 
-def install_packages():
+def _probe(name, command):
+    """
+    Run a version command to check that a tool is available
+    
+    Args:
+        name: Name of the tool
+        command: Command to run
+        
+    Returns:
+        Tuple of (name, whether the command succeeded, its output or error)
+    """
+    import subprocess
+    
+    try:
+        result = subprocess.run(command, check=False, text=True, capture_output=True)
+    except OSError as e:
+        return name, False, str(e)
+    
+    if result.returncode != 0:
+        return name, False, result.stderr.strip() or f"exit code {result.returncode}"
+    return name, True, result.stdout.strip()
+
+def _requirements_fingerprint(path):
+    """
+    Compute the SHA-256 fingerprint of a requirements file
+    
+    Args:
+        path: Path to the requirements file
+        
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _write_requirements_marker(fingerprint):
+    """
+    Record the fingerprint of the installed requirements
+    
+    Args:
+        fingerprint: Fingerprint of requirements.txt
+    """
+    # Write then rename so an interrupted run can't leave a partial marker
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_marker = REQUIREMENTS_MARKER.with_suffix(".tmp")
+    tmp_marker.write_text(fingerprint)
+    os.replace(tmp_marker, REQUIREMENTS_MARKER)
+
+def _install_roots():
+    """
+    Get the directories pip installs into for the current interpreter
+    
+    Returns:
+        Dictionary mapping sysconfig path names to distinct directories
+    """
+    roots = {}
+    for name in ("purelib", "platlib", "scripts"):
+        path = sysconfig.get_paths()[name]
+        if path not in roots.values():
+            roots[name] = path
+    return roots
+
+def _installed_distributions(roots):
+    """
+    Find the distributions installed in the install directories and their files
+    
+    Args:
+        roots: Directories returned by _install_roots
+        
+    Returns:
+        Dictionary mapping normalized project names to lists of (root name, relative path)
+        pairs, for files that exist under one of the install directories
+    """
+    from importlib.metadata import distributions
+    
+    # Longest root first so files are attributed to the most specific directory
+    ordered_roots = sorted(roots.items(), key=lambda item: len(item[1]), reverse=True)
+    lib_paths = [roots[name] for name in ("purelib", "platlib") if name in roots]
+    
+    installed = {}
+    for dist in distributions(path=lib_paths):
+        name = dist.metadata["Name"]
+        if not name or dist.files is None:
+            continue
+        files = []
+        for file in dist.files:
+            path = os.path.normpath(str(dist.locate_file(file)))
+            if not os.path.isfile(path):
+                continue
+            for root_name, root in ordered_roots:
+                if path.startswith(root + os.sep):
+                    files.append((root_name, os.path.relpath(path, root)))
+                    break
+        installed[re.sub(r"[-_.]+", "-", name).lower()] = files
+    return installed
+
+def _snapshot_path(fingerprint):
+    """
+    Get the environment snapshot file for the current environment, platform and requirements
+    
+    Args:
+        fingerprint: Fingerprint of requirements.txt
+        
+    Returns:
+        Path of the snapshot archive
+    """
+    # Console scripts point at this environment's interpreter and extension modules are
+    # platform specific, so a snapshot only applies to the same environment and platform
+    key = hashlib.sha1(f"{sys.prefix}|{sysconfig.get_platform()}|{fingerprint}".encode("utf-8")).hexdigest()[:16]
+    extension = "tar.zst" if ZSTD_AVAILABLE else "tar.gz"
+    return SNAPSHOT_DIR / f"env-{sys.version_info.major}.{sys.version_info.minor}-{key}.{extension}"
+
+def _save_snapshot(snapshot, roots):
+    """
+    Archive every file of the distributions installed in the install directories,
+    except pip, setuptools and wheel
+    
+    The archive starts with a manifest of the project names, which _restore_snapshot
+    uses to remove other installed versions of them before extracting.
+    
+    Args:
+        snapshot: Path of the snapshot archive to write
+        roots: Directories returned by _install_roots
+    """
+    import io
+    import tarfile
+    
+    # pip and the build tools stay as installed, so a failed restore can still fall back to pip
+    installed = {
+        name: files for name, files in _installed_distributions(roots).items()
+        if name not in _SNAPSHOT_EXCLUDE
+    }
+    files = sorted({file for dist_files in installed.values() for file in dist_files})
+    if not files:
+        logger.warning("No installed distributions found, not saving an environment snapshot")
+        return
+    
+    manifest = "\n".join(sorted(installed)).encode("utf-8")
+    manifest_info = tarfile.TarInfo(_SNAPSHOT_MANIFEST)
+    manifest_info.size = len(manifest)
+    
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_snapshot = snapshot.with_name(snapshot.name + ".tmp")
+    
+    with open(tmp_snapshot, "wb") as f:
+        if ZSTD_AVAILABLE:
+            stream = zstandard.ZstdCompressor().stream_writer(f, closefd=False)
+            tar = tarfile.open(fileobj=stream, mode="w|")
+        else:
+            stream = None
+            tar = tarfile.open(fileobj=f, mode="w|gz")
+        with tar:
+            tar.addfile(manifest_info, io.BytesIO(manifest))
+            for name, relpath in files:
+                tar.add(os.path.join(roots[name], relpath), arcname=f"{name}/{relpath}", recursive=False)
+        if stream is not None:
+            stream.close()
+    
+    os.replace(tmp_snapshot, snapshot)
+    logger.info(f"Saved environment snapshot of {len(installed)} distributions ({len(files)} files) to {snapshot}")
+
+def _remove_distributions(names, roots):
+    """
+    Remove the files of installed distributions, so restoring another version doesn't
+    leave a second dist-info directory behind
+    
+    Args:
+        names: Normalized project names to remove
+        roots: Directories returned by _install_roots
+    """
+    dirs = set()
+    for name, files in _installed_distributions(roots).items():
+        if name not in names:
+            continue
+        for root_name, relpath in files:
+            path = os.path.join(roots[root_name], relpath)
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            dirs.add(os.path.dirname(path))
+    
+    # Remove directories left empty, deepest first
+    for path in sorted(dirs, key=len, reverse=True):
+        while path not in roots.values():
+            try:
+                os.rmdir(path)
+            except OSError:
+                break
+            path = os.path.dirname(path)
+
+def _restore_snapshot(snapshot, roots):
+    """
+    Extract an environment snapshot into the install directories
+    
+    The archive is extracted to a staging directory and checked first, so a damaged
+    or foreign archive leaves the environment untouched. Only then are the installed
+    versions of its distributions removed and the staged files moved into place.
+    
+    Args:
+        snapshot: Path of the snapshot archive
+        roots: Directories returned by _install_roots
+        
+    Raises:
+        ValueError: If the archive has no manifest, contains no distributions or
+            doesn't match its manifest
+    """
+    import shutil
+    import tarfile
+    import tempfile
+    from importlib.metadata import distributions
+    
+    # Reject absolute paths, links out of the staging directory and special files
+    extract_kwargs = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+    
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix="restore-", dir=SNAPSHOT_DIR)
+    try:
+        with open(snapshot, "rb") as f:
+            if ZSTD_AVAILABLE:
+                tar = tarfile.open(fileobj=zstandard.ZstdDecompressor().stream_reader(f), mode="r|")
+            else:
+                tar = tarfile.open(fileobj=f, mode="r|gz")
+            with tar:
+                member = tar.next()
+                if member is None or member.name != _SNAPSHOT_MANIFEST:
+                    raise ValueError("snapshot has no manifest")
+                names = set(tar.extractfile(member).read().decode("utf-8").split())
+                if not names:
+                    raise ValueError("snapshot contains no distributions")
+                if names & _SNAPSHOT_EXCLUDE:
+                    raise ValueError(f"snapshot contains {', '.join(sorted(names & _SNAPSHOT_EXCLUDE))}")
+                
+                # Keep reading with next(); iterating the archive would start over at the manifest
+                member = tar.next()
+                while member is not None:
+                    root_name = member.name.partition("/")[0]
+                    if root_name not in roots:
+                        raise ValueError(f"snapshot contains unknown install directory: {root_name}")
+                    tar.extract(member, staging, **extract_kwargs)
+                    member = tar.next()
+        
+        # Every distribution in the manifest must have been extracted, and nothing else
+        staged_libs = [os.path.join(staging, name) for name in ("purelib", "platlib") if name in roots]
+        staged = {
+            re.sub(r"[-_.]+", "-", dist.metadata["Name"]).lower()
+            for dist in distributions(path=staged_libs) if dist.metadata["Name"]
+        }
+        if staged != names:
+            raise ValueError("snapshot contents don't match its manifest")
+        
+        _remove_distributions(names, roots)
+        
+        for root_name, root in roots.items():
+            staged_root = os.path.join(staging, root_name)
+            for dirpath, _, filenames in os.walk(staged_root):
+                target_dir = os.path.join(root, os.path.relpath(dirpath, staged_root))
+                os.makedirs(target_dir, exist_ok=True)
+                for filename in filenames:
+                    shutil.move(os.path.join(dirpath, filename), os.path.join(target_dir, filename))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    
+    logger.info(f"Restored environment snapshot of {len(names)} distributions from {snapshot}")
+
+def install_packages(env_snapshot=False, index_url=None, extra_index_url=None, allow_sdist=False):
     """
     Install required Python packages
+    
+    Installs from requirements.lock instead of requirements.txt when it exists. The
+    install is skipped when the requirements haven't changed since the last
+    successful install, and pip's download cache is kept between runs. Only wheels
+    are installed unless allow_sdist is set, so nothing is built from source.
+    
+    Args:
+        env_snapshot: Whether to restore the installed packages from a snapshot archive
+            instead of running pip, and to save one after a successful install
+        index_url: Optional package index to use instead of PyPI (e.g. a local mirror)
+        extra_index_url: Optional additional package index
+        allow_sdist: Whether to fall back to building packages that have no wheel
     """
     logger.info("Installing required Python packages...")
     
-    requirements_file = Path(__file__).parent / "requirements.txt"
+    requirements_file = HERE / "requirements.txt"
     
-    if not requirements_file.exists():
+    if not os.path.exists(requirements_file):
         logger.error(f"Requirements file not found: {requirements_file}")
         sys.exit(1)
     
+    # A hash-locked requirements file is fully resolved already, so pip can skip dependency resolution
+    lock_file = requirements_file.with_name("requirements.lock")
+    if os.path.exists(lock_file):
+        logger.info(f"Installing from lock file {lock_file}")
+        requirements_file = lock_file
+        lock_args = ["--require-hashes", "--no-deps"]
+    else:
+        lock_args = []
+    
+    fingerprint = _requirements_fingerprint(requirements_file)
+    if os.path.exists(REQUIREMENTS_MARKER) and REQUIREMENTS_MARKER.read_text().strip() == fingerprint:
+        logger.info("Requirements unchanged since the last install, skipping")
+        return
+    
+    roots = _install_roots() if env_snapshot else None
+    snapshot = _snapshot_path(fingerprint) if env_snapshot else None
+    if snapshot is not None and os.path.exists(snapshot):
+        try:
+            _restore_snapshot(snapshot, roots)
+            _write_requirements_marker(fingerprint)
+            return
+        except Exception as e:
+            logger.warning(f"Failed to restore environment snapshot, installing with pip: {str(e)}")
+    
+    pip_args = ["--prefer-binary", "--disable-pip-version-check"]
+    if not allow_sdist:
+        pip_args.append("--only-binary=:all:")
+    if index_url:
+        pip_args += ["--index-url", index_url]
+    if extra_index_url:
+        pip_args += ["--extra-index-url", extra_index_url]
+    
     try:
-        run_command(["pip", "install", "-r", str(requirements_file)])
+        run_command([sys.executable, "-m", "pip", "install", *lock_args, *pip_args, "--cache-dir", str(PIP_CACHE_DIR), "-r", str(requirements_file)])
         logger.info("All packages installed successfully")
     except Exception as e:
         logger.error(f"Failed to install packages: {str(e)}")
         sys.exit(1)
+    
+    _write_requirements_marker(fingerprint)
+    
+    if env_snapshot:
+        try:
+            _save_snapshot(snapshot, roots)
+        except Exception as e:
+            logger.warning(f"Failed to save environment snapshot: {str(e)}")
+
+def _copy_file(src, dst):
+    """
+    Copy the contents of one file to another
+    
+    Uses os.sendfile where available so the data is copied in the kernel, and a
+    1 MiB buffered copy otherwise. Permission bits are not copied.
+    
+    Args:
+        src: Path of the file to copy
+        dst: Path of the destination file
+    """
+    import shutil
+    
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        size = os.fstat(s.fileno()).st_size
+        if hasattr(os, "sendfile"):
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(d.fileno(), s.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        else:
+            shutil.copyfileobj(s, d, length=1 << 20)
+
+def compile_lock():
+    """
+    Regenerate requirements.lock from requirements.txt with pinned versions and hashes
+    """
+    logger.info("Compiling requirements lock file...")
+    
+    requirements_file = HERE / "requirements.txt"
+    lock_file = requirements_file.with_name("requirements.lock")
+    
+    try:
+        run_command(["pip-compile", "--generate-hashes", "-o", str(lock_file), str(requirements_file)])
+        logger.info(f"Lock file written to {lock_file}")
+    except Exception as e:
+        logger.error(f"Failed to compile lock file (is pip-tools installed?): {str(e)}")
+        sys.exit(1)
 
 def setup_systemd_service(username):
     """
@@ -115,42 +581,41 @@ def setup_systemd_service(username):
     Args:
         username: System username
     """
+    import tempfile
+    
     logger.info("Setting up systemd service...")
     
     # Define the service file path
     service_path = Path("/etc/systemd/system/manus-agent.service")
     
     # Get the absolute path to the project
-    project_path = Path(__file__).parent.absolute()
+    project_path = HERE
     
-    # Define the service file content
-    service_content = f"""[Unit]
-Description=Manus AI Agent
-After=network.target
-
-[Service]
-User={username}
-WorkingDirectory={project_path}
-ExecStart=/usr/bin/python3 {project_path}/main.py
-Restart=always
-RestartSec=10
-Environment=PYTHONUNBUFFERED=1
-
-[Install]
-WantedBy=multi-user.target
-"""
+    # Define the service file content; run the agent with the interpreter used for the deployment
+    service_content = _SYSTEMD_TEMPLATE.format_map({
+        "username": username,
+        "project_path": project_path,
+        "python": sys.executable
+    })
     
-    # Write the service file
+    # Write the service file next to its final path and publish it with a single rename,
+    # so systemd never sees a partially written unit or one with the wrong permissions
     try:
-        with open(service_path, "w") as f:
-            f.write(service_content)
-        
-        # Set proper permissions
-        os.chmod(service_path, 0o644)
+        fd, tmp_path = tempfile.mkstemp(dir=service_path.parent, prefix=".manus-agent.", suffix=".tmp")
+        try:
+            try:
+                os.write(fd, service_content.encode("utf-8"))
+                os.fchmod(fd, 0o644)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, service_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
         
-        # Reload systemd and enable the service
-        run_command(["systemctl", "daemon-reload"])
-        run_command(["systemctl", "enable", "manus-agent.service"])
+        # Reload systemd and enable the service in a single shell invocation
+        run_command("systemctl daemon-reload && systemctl enable manus-agent.service", shell=True)
         
         logger.info("Systemd service set up successfully")
         logger.info("You can start the service with: sudo systemctl start manus-agent.service")
@@ -166,36 +631,52 @@ def configure_env_file(api_key=None):
     Args:
         api_key: Optional OpenRouter API key
     """
+    import shutil
+    import tempfile
+    
     logger.info("Configuring .env file...")
     
-    env_file = Path(__file__).parent / ".env"
-    env_example_file = Path(__file__).parent / ".env.example"
+    env_file = HERE / ".env"
+    env_example_file = HERE / ".env.example"
     
     # Check if .env.example exists
-    if not env_example_file.exists():
+    if not os.path.exists(env_example_file):
         logger.error(f".env.example file not found: {env_example_file}")
         sys.exit(1)
     
     # Copy .env.example to .env if .env doesn't exist
-    if not env_file.exists():
-        shutil.copy(env_example_file, env_file)
+    if not os.path.exists(env_file):
+        _copy_file(env_example_file, env_file)
         logger.info(f"Created .env file from .env.example")
     
     # Update API key if provided
     if api_key:
-        logger.info("Updating API key in .env file...")
-        
-        # Read the current .env file
+        # Leave the file alone if it already has this key
         with open(env_file, "r") as f:
-            env_lines = f.readlines()
+            current_key = next(
+                (line[len("OPENROUTER_API_KEY="):].rstrip("\r\n") for line in f if line.startswith("OPENROUTER_API_KEY=")),
+                None
+            )
+        if current_key == api_key:
+            logger.info("API key unchanged, skipping write")
+            return
+        
+        logger.info("Updating API key in .env file...")
         
-        # Update the API key line
-        with open(env_file, "w") as f:
-            for line in env_lines:
-                if line.startswith("OPENROUTER_API_KEY="):
-                    f.write(f"OPENROUTER_API_KEY={api_key}\n")
-                else:
-                    f.write(line)
+        # Stream the updated file into a temporary file next to it, then swap it in atomically
+        tmp = tempfile.NamedTemporaryFile("w", dir=env_file.parent, prefix=".env.", delete=False)
+        try:
+            with tmp, open(env_file, "r", buffering=65536) as f:
+                for line in f:
+                    if line.startswith("OPENROUTER_API_KEY="):
+                        tmp.write(f"OPENROUTER_API_KEY={api_key}\n")
+                    else:
+                        tmp.write(line)
+            shutil.copymode(env_file, tmp.name)
+            os.replace(tmp.name, env_file)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
         
         logger.info("API key updated successfully")
 
@@ -207,17 +688,32 @@ def main():
     parser.add_argument("--username", default="root", help="System username for systemd service")
     parser.add_argument("--setup-service", action="store_true", help="Set up systemd service")
     parser.add_argument("--install-deps", action="store_true", help="Install dependencies")
+    parser.add_argument("--env-snapshot", action="store_true", help="Restore/save installed packages from a snapshot instead of running pip")
+    parser.add_argument("--compile-lock", action="store_true", help="Regenerate requirements.lock with pip-compile and exit")
+    parser.add_argument("--index-url", help="Package index to install from instead of PyPI (e.g. a local mirror)")
+    parser.add_argument("--extra-index-url", help="Additional package index to install from")
+    parser.add_argument("--force-check", action="store_true", help="Check dependencies even if they passed recently")
+    parser.add_argument("--allow-sdist", action="store_true", help="Allow building packages from source when no wheel is available")
     
     args = parser.parse_args()
     
+    if args.compile_lock:
+        compile_lock()
+        return
+    
     logger.info("Starting deployment of Manus AI Agent...")
     
     # Check dependencies
-    check_dependencies()
+    check_dependencies(force=args.force_check)
     
     # Install packages if requested
     if args.install_deps:
-        install_packages()
+        install_packages(
+            env_snapshot=args.env_snapshot,
+            index_url=args.index_url,
+            extra_index_url=args.extra_index_url,
+            allow_sdist=args.allow_sdist
+        )
     
     # Configure .env file
     configure_env_file(args.api_key)
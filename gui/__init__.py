@@ -4,6 +4,11 @@ GUI Module for Manus AI Agent
 This module handles the graphical user interface for the agent system.
 """
 
-from .app import start_gui, ManusAgentGUI
+__all__ = ['start_gui', 'ManusAgentGUI']
 
-__all__ = ['start_gui', 'ManusAgentGUI'] 
\ No newline at end of file
+def __getattr__(name):
+    # Import the Qt application module on first use, so importing the package stays cheap
+    if name in __all__:
+        from . import app
+        return getattr(app, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
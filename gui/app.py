@@ -8,73 +8,38 @@ import os
 import sys
 import json
 import asyncio
-import time
 import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import collections
+import itertools
 from typing import Dict, Any, Optional, List
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QTextEdit, QPushButton, QCheckBox,
     QTabWidget, QSplitter, QFrame, QGroupBox, QFormLayout,
-    QComboBox, QProgressBar, QFileDialog, QMessageBox
+    QComboBox, QFileDialog, QMessageBox
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize, QTimer
+from PyQt5.QtCore import Qt, QSize, QTimer
 from PyQt5.QtGui import QFont, QIcon, QTextCursor
+import qasync
 
 from ..agents.orchestrator import AgentOrchestrator
+from ..config.settings import load_settings, save_gui_settings, clear_gui_settings
 
 logger = logging.getLogger(__name__)
 
-# Helper thread for running async tasks
-class AsyncTaskThread(QThread):
-    """Thread for running async tasks without blocking the GUI"""
-    
-    # Define signals for communicating with the main thread
-    task_started = pyqtSignal()
-    task_progress = pyqtSignal(str)
-    task_complete = pyqtSignal(dict)
-    task_error = pyqtSignal(str)
-    
-    def __init__(self, orchestrator: AgentOrchestrator, task: str, yolo_mode: bool = False):
-        """
-        Initialize the async task thread
-        
-        Args:
-            orchestrator: The agent orchestrator instance
-            task: The task to run
-            yolo_mode: Whether to run in autonomous mode
-        """
-        super().__init__()
-        self.orchestrator = orchestrator
-        self.task = task
-        self.yolo_mode = yolo_mode
-    
-    async def _run_task_async(self):
-        """Run the task asynchronously"""
-        try:
-            self.task_started.emit()
-            
-            # Execute the task
-            results = await self.orchestrator.run_task(self.task, self.yolo_mode)
-            
-            # Emit the completion signal with results
-            self.task_complete.emit(results)
-            
-        except Exception as e:
-            logger.error(f"Error running task: {str(e)}", exc_info=True)
-            self.task_error.emit(str(e))
-    
-    def run(self):
-        """Run the thread"""
-        # Set up asyncio event loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            # Run the async task
-            loop.run_until_complete(self._run_task_async())
-        finally:
-            loop.close()
+# Worker threads for blocking calls (API requests, tools) made from tasks on the GUI event loop
+_EXECUTOR_WORKERS = 8
 
+# Display text for plan step statuses
+_STATUS_TEXT = {
+    "pending": "⏳ Pending",
+    "in_progress": "⏳ In Progress",
+    "completed": "✅ Completed",
+    "failed": "❌ Failed",
+    "unknown": "❓ Unknown"
+}
 
 class ManusAgentGUI(QMainWindow):
     """Main GUI window for the Manus AI Agent"""
@@ -88,9 +53,29 @@ class ManusAgentGUI(QMainWindow):
         """
         super().__init__()
         self.orchestrator = orchestrator
-        self.task_thread = None
+        self._task_running = False
         self.current_task_results = None
         
+        # Results currently shown in the text views and how many of their steps were rendered
+        self._rendered_results = None
+        self._rendered_plan_steps = 0
+        self._rendered_exec_steps = 0
+        
+        # History dropdown labels keyed by (timestamp, task)
+        self._history_labels = {}
+        
+        # Rendered tool arguments keyed by id() of the execution, with the execution kept
+        # alongside so the id can't be reused while the entry exists
+        self._args_json = {}
+        
+        # Progress messages are buffered and appended to the output at most ~30 times a second;
+        # the timer only runs while messages are waiting
+        self._progress_buf = collections.deque()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(33)
+        self._flush_timer.timeout.connect(self._flush_progress)
+        
         # Set up the main window
         self.setWindowTitle("Manus AI Agent")
         self.setMinimumSize(900, 700)
@@ -196,6 +181,10 @@ class ManusAgentGUI(QMainWindow):
         self.tools_text = QTextEdit()
         self.tools_text.setReadOnly(True)
         
+        # Cursors kept for appending; they stay valid when the documents are cleared or replaced
+        self._output_cursor = self.output_text.textCursor()
+        self._tools_cursor = self.tools_text.textCursor()
+        
         bottom_layout.addWidget(tools_label)
         bottom_layout.addWidget(self.tools_text)
         
@@ -214,6 +203,7 @@ class ManusAgentGUI(QMainWindow):
         plan_label = QLabel("Task Plan:")
         self.plan_text = QTextEdit()
         self.plan_text.setReadOnly(True)
+        self._plan_cursor = self.plan_text.textCursor()
         
         layout.addWidget(plan_label)
         layout.addWidget(self.plan_text)
@@ -254,7 +244,7 @@ class ManusAgentGUI(QMainWindow):
         
         self.api_key_input = QLineEdit()
         self.api_key_input.setEchoMode(QLineEdit.Password)
-        self.api_key_input.setText(os.getenv("OPENROUTER_API_KEY", ""))
+        self.api_key_input.setText(self.orchestrator.settings.openrouter_api_key)
         
         self.model_dropdown = QComboBox()
         default_models = [
@@ -264,7 +254,7 @@ class ManusAgentGUI(QMainWindow):
             "gpt-4-turbo-preview"
         ]
         self.model_dropdown.addItems(default_models)
-        self.model_dropdown.setCurrentText(os.getenv("DEFAULT_MODEL", "claude-3-sonnet-20240229"))
+        self.model_dropdown.setCurrentText(self.orchestrator.settings.default_model)
         
         api_layout.addRow("OpenRouter API Key:", self.api_key_input)
         api_layout.addRow("Default Model:", self.model_dropdown)
@@ -275,10 +265,10 @@ class ManusAgentGUI(QMainWindow):
         security_layout = QFormLayout()
         
         self.sandbox_checkbox = QCheckBox()
-        self.sandbox_checkbox.setChecked(True)
+        self.sandbox_checkbox.setChecked(self.orchestrator.settings.enable_sandbox)
         
         self.max_execution_time = QLineEdit()
-        self.max_execution_time.setText("300")
+        self.max_execution_time.setText(str(self.orchestrator.settings.max_execution_time))
         
         security_layout.addRow("Enable Sandbox:", self.sandbox_checkbox)
         security_layout.addRow("Max Execution Time (s):", self.max_execution_time)
@@ -302,17 +292,16 @@ class ManusAgentGUI(QMainWindow):
         """Set up the status bar"""
         self.status_bar = self.statusBar()
         
-        # Task progress
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 0)  # Indeterminate progress
-        self.progress_bar.setFixedWidth(150)
-        self.progress_bar.setVisible(False)
-        
         # Status text
         self.status_label = QLabel("Ready")
         
+        # Task progress: a text spinner ticking 4 times a second while a task runs, instead of
+        # an indeterminate progress bar that animates at full frame rate
+        self._spinner_frames = itertools.cycle("|/-\\")
+        self._spinner_timer = QTimer(self)
+        self._spinner_timer.timeout.connect(self._tick_spinner)
+        
         # Add to status bar
-        self.status_bar.addPermanentWidget(self.progress_bar)
         self.status_bar.addPermanentWidget(self.status_label)
     
     def _connect_events(self):
@@ -329,7 +318,8 @@ class ManusAgentGUI(QMainWindow):
         self.save_settings_button.clicked.connect(self.save_settings)
         self.reset_settings_button.clicked.connect(self.reset_settings)
     
-    def run_task(self):
+    @qasync.asyncSlot()
+    async def run_task(self):
         """Run a task with the agent orchestrator"""
         task = self.task_input.text().strip()
         
@@ -338,39 +328,49 @@ class ManusAgentGUI(QMainWindow):
             return
         
         # Check if another task is already running
-        if self.task_thread and self.task_thread.isRunning():
+        if self._task_running:
             QMessageBox.warning(self, "Task Running", "Another task is already running. Please wait for it to complete.")
             return
         
         # Get YOLO mode setting
         yolo_mode = self.yolo_checkbox.isChecked()
         
-        # Create and start the task thread
-        self.task_thread = AsyncTaskThread(self.orchestrator, task, yolo_mode)
-        
-        # Connect signals
-        self.task_thread.task_started.connect(self.on_task_started)
-        self.task_thread.task_progress.connect(self.on_task_progress)
-        self.task_thread.task_complete.connect(self.on_task_complete)
-        self.task_thread.task_error.connect(self.on_task_error)
-        
-        # Start the thread
-        self.task_thread.start()
-        
         logger.info(f"Started task: {task}, YOLO mode: {yolo_mode}")
+        
+        # Await the task directly on the Qt-integrated event loop; the GUI stays responsive
+        # because the orchestrator's blocking calls run in the loop's worker threads
+        self._task_running = True
+        try:
+            self.on_task_started()
+            await asyncio.sleep(0)  # let the started state paint before planning begins
+            results = await self.orchestrator.run_task(task, yolo_mode, on_progress=self.on_task_progress)
+        except Exception as e:
+            logger.error(f"Error running task: {str(e)}", exc_info=True)
+            self.on_task_error(str(e))
+        else:
+            self.on_task_complete(results)
+        finally:
+            self._task_running = False
     
     def on_task_started(self):
         """Handle task started event"""
         # Update UI
-        self.progress_bar.setVisible(True)
         self.status_label.setText("Running task...")
+        self._spinner_timer.start(250)
         self.submit_button.setEnabled(False)
         self.output_text.clear()
         self.tools_text.clear()
         self.plan_text.clear()
+        self._rendered_results = None
         
         # Show initial message
         self.output_text.append("Task started, generating plan...\n")
+        self._flush_timer.stop()
+        self._progress_buf.clear()
+    
+    def _tick_spinner(self):
+        """Advance the running-task spinner in the status bar"""
+        self.status_label.setText(f"Running task... {next(self._spinner_frames)}")
     
     def on_task_progress(self, message: str):
         """
@@ -379,9 +379,26 @@ class ManusAgentGUI(QMainWindow):
         Args:
             message: Progress message
         """
-        # Update output text
-        self.output_text.append(message)
-        self.output_text.moveCursor(QTextCursor.End)
+        # Schedule a flush for the first message since the last one
+        if not self._progress_buf:
+            self._flush_timer.start()
+        self._progress_buf.append(message)
+    
+    def _flush_progress(self):
+        """Append the buffered progress messages to the output in one update"""
+        if not self._progress_buf:
+            return
+        
+        buf, self._progress_buf = self._progress_buf, collections.deque()
+        
+        # Repaint once after both the append and the scroll
+        self.output_text.setUpdatesEnabled(False)
+        try:
+            self._output_cursor.movePosition(QTextCursor.End)
+            self._output_cursor.insertText("\n".join(buf) + "\n")
+            self.output_text.moveCursor(QTextCursor.End)
+        finally:
+            self.output_text.setUpdatesEnabled(True)
     
     def on_task_complete(self, results: Dict[str, Any]):
         """
@@ -392,9 +409,11 @@ class ManusAgentGUI(QMainWindow):
         """
         # Store the results
         self.current_task_results = results
+        self._flush_timer.stop()
+        self._progress_buf.clear()
         
         # Update UI
-        self.progress_bar.setVisible(False)
+        self._spinner_timer.stop()
         self.status_label.setText("Task completed")
         self.submit_button.setEnabled(True)
         
@@ -413,8 +432,12 @@ class ManusAgentGUI(QMainWindow):
         Args:
             error_message: Error message
         """
+        # Show any progress that arrived before the error
+        self._flush_timer.stop()
+        self._flush_progress()
+        
         # Update UI
-        self.progress_bar.setVisible(False)
+        self._spinner_timer.stop()
         self.status_label.setText("Task failed")
         self.submit_button.setEnabled(True)
         
@@ -431,90 +454,124 @@ class ManusAgentGUI(QMainWindow):
         """
         Display task execution results in the UI
         
+        Rendering is incremental: when the same results are displayed again, only
+        steps added since the last call are appended to the text views.
+        
         Args:
             results: Task execution results
         """
-        # Display plan
         plan = results.get("plan", [])
-        plan_text = "# Task Plan\n\n"
+        execution = results.get("execution", {})
+        steps = execution.get("steps", [])
         
-        for i, step in enumerate(plan):
-            status = step.get("status", "unknown")
-            status_text = {
-                "pending": "⏳ Pending",
-                "in_progress": "⏳ In Progress",
-                "completed": "✅ Completed",
-                "failed": "❌ Failed",
-                "unknown": "❓ Unknown"
-            }.get(status, status)
+        # Start over with fresh headers when switching to different results
+        if results is not self._rendered_results:
+            self._rendered_results = results
+            self._rendered_plan_steps = 0
+            self._rendered_exec_steps = 0
             
-            plan_text += f"## Step {i+1}: {step.get('description', 'Unknown step')}\n"
-            plan_text += f"**Status:** {status_text}\n\n"
+            output_header = [
+                "# Task Execution Results\n\n",
+                f"**Overall Status:** {execution.get('overall_status', 'unknown')}\n"
+            ]
+            if "duration" in execution:
+                output_header.append(f"**Duration:** {execution['duration']:.2f} seconds\n\n")
             
-            if step.get("subtasks"):
-                plan_text += "**Subtasks:**\n"
-                for subtask in step.get("subtasks", []):
-                    plan_text += f"- {subtask}\n"
-                plan_text += "\n"
+            self.plan_text.setPlainText("# Task Plan\n\n")
+            self.output_text.setPlainText("".join(output_header))
+            self.tools_text.setPlainText("# Tool Executions\n\n")
         
-        self.plan_text.setPlainText(plan_text)
-        
-        # Display execution results
-        execution = results.get("execution", {})
-        steps = execution.get("steps", [])
-        
-        output_text = "# Task Execution Results\n\n"
-        output_text += f"**Overall Status:** {execution.get('overall_status', 'unknown')}\n"
-        if "duration" in execution:
-            output_text += f"**Duration:** {execution['duration']:.2f} seconds\n\n"
+        # Display plan
+        plan_parts = []
         
-        for step in steps:
-            step_num = step.get("step_num", "?")
-            description = step.get("description", "Unknown step")
+        for i, step in enumerate(plan[self._rendered_plan_steps:], self._rendered_plan_steps):
             status = step.get("status", "unknown")
+            status_text = _STATUS_TEXT.get(status, status)
             
-            output_text += f"## Step {step_num}: {description}\n"
-            output_text += f"**Status:** {status}\n\n"
-            
-            step_result = step.get("result", {})
-            if "summary" in step_result:
-                output_text += f"**Summary:** {step_result['summary']}\n\n"
+            plan_parts.append(f"## Step {i+1}: {step.get('description', 'Unknown step')}\n")
+            plan_parts.append(f"**Status:** {status_text}\n\n")
             
-            if "execution_text" in step_result:
-                output_text += "**Execution:**\n"
-                output_text += f"{step_result['execution_text']}\n\n"
+            subtasks = step.get("subtasks") or ()
+            if subtasks:
+                plan_parts.append("**Subtasks:**\n")
+                for subtask in subtasks:
+                    plan_parts.append(f"- {subtask}\n")
+                plan_parts.append("\n")
         
-        self.output_text.setPlainText(output_text)
+        self._append_text(self.plan_text, self._plan_cursor, "".join(plan_parts))
+        self._rendered_plan_steps = len(plan)
         
-        # Display tool executions
-        tools_text = "# Tool Executions\n\n"
+        # Display execution results and tool executions, looking up each step's fields once
+        output_parts = []
+        tools_parts = []
         
-        for step in steps:
+        for step in steps[self._rendered_exec_steps:]:
             step_num = step.get("step_num", "?")
-            step_result = step.get("result", {})
-            tool_executions = step_result.get("tool_executions", [])
+            step_result = step.get("result") or {}
+            
+            output_parts.append(f"## Step {step_num}: {step.get('description', 'Unknown step')}\n")
+            output_parts.append(f"**Status:** {step.get('status', 'unknown')}\n\n")
             
+            summary = step_result.get("summary")
+            if summary is not None:
+                output_parts.append(f"**Summary:** {summary}\n\n")
+            
+            execution_text = step_result.get("execution_text")
+            if execution_text is not None:
+                output_parts.append("**Execution:**\n")
+                output_parts.append(f"{execution_text}\n\n")
+            
+            tool_executions = step_result.get("tool_executions") or ()
             if tool_executions:
-                tools_text += f"## Step {step_num} Tool Executions\n\n"
+                tools_parts.append(f"## Step {step_num} Tool Executions\n\n")
                 
                 for i, execution in enumerate(tool_executions):
                     tool = execution.get("tool", "unknown")
-                    args = execution.get("args", {})
                     success = execution.get("success", False)
                     result = execution.get("result", "")
                     
-                    tools_text += f"### {i+1}. {tool}\n"
-                    tools_text += f"**Success:** {'Yes' if success else 'No'}\n"
-                    tools_text += f"**Arguments:** {json.dumps(args, indent=2)}\n\n"
+                    # Keep the rendered arguments so history reloads don't re-encode them
+                    cached = self._args_json.get(id(execution))
+                    if cached is not None and cached[0] is execution:
+                        args_json = cached[1]
+                    else:
+                        args_json = json.dumps(execution.get("args", {}), indent=2)
+                        self._args_json[id(execution)] = (execution, args_json)
+                    
+                    tools_parts.append(f"### {i+1}. {tool}\n")
+                    tools_parts.append(f"**Success:** {'Yes' if success else 'No'}\n")
+                    tools_parts.append(f"**Arguments:** {args_json}\n\n")
                     
                     if result:
-                        tools_text += "**Result:**\n"
-                        tools_text += f"```\n{result}\n```\n\n"
+                        tools_parts.append("**Result:**\n")
+                        tools_parts.append(f"```\n{result}\n```\n\n")
                     
-                    if "error" in execution:
-                        tools_text += f"**Error:** {execution['error']}\n\n"
+                    error = execution.get("error")
+                    if error is not None:
+                        tools_parts.append(f"**Error:** {error}\n\n")
         
-        self.tools_text.setPlainText(tools_text)
+        self._append_text(self.output_text, self._output_cursor, "".join(output_parts))
+        self._append_text(self.tools_text, self._tools_cursor, "".join(tools_parts))
+        self._rendered_exec_steps = len(steps)
+    
+    def _append_text(self, text_edit: QTextEdit, cursor: QTextCursor, text: str):
+        """
+        Append plain text to the end of a text view without rebuilding its document
+        
+        Args:
+            text_edit: The text view to append to
+            cursor: The persistent append cursor of the text view
+            text: Text to append
+        """
+        if not text:
+            return
+        
+        text_edit.setUpdatesEnabled(False)
+        try:
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(text)
+        finally:
+            text_edit.setUpdatesEnabled(True)
     
     def load_history_item(self):
         """Load and display a history item"""
@@ -526,7 +583,7 @@ class ManusAgentGUI(QMainWindow):
         # Get the selected history item
         history_item = self.orchestrator.task_history[selected_index]
         
-        # Display it
+        # Display it; reloading the item that is already shown leaves the views untouched
         self._display_task_results(history_item)
         
         # Show message
@@ -545,7 +602,7 @@ class ManusAgentGUI(QMainWindow):
         
         if confirm == QMessageBox.Yes:
             # Clear the history
-            self.orchestrator.task_history = []
+            self.orchestrator.task_history.clear()
             
             # Update dropdown
             self._update_history_dropdown()
@@ -556,35 +613,34 @@ class ManusAgentGUI(QMainWindow):
             # Show message
             self.status_label.setText("Task history cleared")
     
-    def save_settings(self):
-        """Save settings"""
-        # Get values from UI
-        api_key = self.api_key_input.text()
-        default_model = self.model_dropdown.currentText()
-        enable_sandbox = self.sandbox_checkbox.isChecked()
+    def _apply_settings_from_ui(self) -> bool:
+        """
+        Copy the values of the settings tab into the orchestrator settings
         
+        Returns:
+            True if the values are valid, False otherwise
+        """
         try:
             max_execution_time = int(self.max_execution_time.text())
         except ValueError:
-            QMessageBox.warning(self, "Invalid Setting", "Max execution time must be a number.")
-            return
+            return False
         
-        # Update settings
         settings = self.orchestrator.settings
-        settings.openrouter_api_key = api_key
-        settings.default_model = default_model
-        settings.enable_sandbox = enable_sandbox
+        settings.openrouter_api_key = self.api_key_input.text()
+        settings.default_model = self.model_dropdown.currentText()
+        settings.enable_sandbox = self.sandbox_checkbox.isChecked()
         settings.max_execution_time = max_execution_time
+        return True
+    
+    def save_settings(self):
+        """Save settings"""
+        # Update settings from the UI
+        if not self._apply_settings_from_ui():
+            QMessageBox.warning(self, "Invalid Setting", "Max execution time must be a number.")
+            return
         
-        # Update environment variables
-        os.environ["OPENROUTER_API_KEY"] = api_key
-        os.environ["DEFAULT_MODEL"] = default_model
-        os.environ["ENABLE_SANDBOX"] = str(enable_sandbox).lower()
-        os.environ["MAX_EXECUTION_TIME"] = str(max_execution_time)
-        
-        # Save settings to file
-        from ..config.settings import save_settings
-        if save_settings(settings):
+        # Save settings to the native settings store, which load_settings() reads on startup
+        if save_gui_settings(self.orchestrator.settings):
             QMessageBox.information(self, "Settings Saved", "Settings have been saved successfully.")
             self.status_label.setText("Settings saved")
         else:
@@ -608,8 +664,8 @@ class ManusAgentGUI(QMainWindow):
             self.sandbox_checkbox.setChecked(True)
             self.max_execution_time.setText("300")
             
-            # Reset orchestrator settings
-            from ..config.settings import load_settings
+            # Drop the saved settings and reset orchestrator settings
+            clear_gui_settings()
             self.orchestrator.settings = load_settings()
             
             # Show message
@@ -617,15 +673,31 @@ class ManusAgentGUI(QMainWindow):
     
     def _update_history_dropdown(self):
         """Update the history dropdown with current history items"""
-        # Clear dropdown
-        self.history_dropdown.clear()
-        
-        # Add history items
+        # Reuse labels of entries that were already listed; the cache only keeps current entries
+        labels = {}
+        items = []
         for item in self.orchestrator.task_history:
-            task = item.get("task", "Unknown task")
-            timestamp = item.get("timestamp", 0)
-            time_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
-            self.history_dropdown.addItem(f"{time_str} - {task}")
+            key = (item.get("timestamp", 0), item.get("task", "Unknown task"))
+            label = labels.get(key) or self._history_labels.get(key)
+            if label is None:
+                label = f"{datetime.fromtimestamp(key[0]).isoformat(sep=' ', timespec='seconds')} - {key[1]}"
+            labels[key] = label
+            items.append(label)
+        
+        # Drop the rendered arguments along with labels of entries that left the history
+        if self._history_labels.keys() - labels.keys():
+            self._args_json.clear()
+        self._history_labels = labels
+        
+        # Replace the items in one batch without emitting signals or repainting per item
+        self.history_dropdown.setUpdatesEnabled(False)
+        self.history_dropdown.blockSignals(True)
+        try:
+            self.history_dropdown.clear()
+            self.history_dropdown.addItems(items)
+        finally:
+            self.history_dropdown.blockSignals(False)
+            self.history_dropdown.setUpdatesEnabled(True)
 
 def start_gui(orchestrator: AgentOrchestrator):
     """
@@ -636,6 +708,14 @@ def start_gui(orchestrator: AgentOrchestrator):
     """
     app = QApplication(sys.argv)
     
+    # Run asyncio on top of the Qt event loop so tasks can be awaited from the GUI thread
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    
+    # Keep a fixed pool of worker threads for the whole session instead of a thread per task
+    executor = ThreadPoolExecutor(max_workers=_EXECUTOR_WORKERS, thread_name_prefix="manus")
+    loop.set_default_executor(executor)
+    
     # Set application style
     app.setStyle("Fusion")
     
@@ -644,4 +724,6 @@ def start_gui(orchestrator: AgentOrchestrator):
     window.show()
     
     # Run the application
-    sys.exit(app.exec_()) 
\ No newline at end of file
+    with loop:
+        loop.run_forever()
+    executor.shutdown(wait=False) 
\ No newline at end of file
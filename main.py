@@ -6,24 +6,27 @@ Manus AI Agent - Main Application Entry Point
 import os
 import sys
 import logging
+from logging.handlers import MemoryHandler
 from dotenv import load_dotenv
 
 # Add the current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import project modules
-from gui.app import start_gui
+# Import project modules; the GUI (and Qt) is imported only once it is started
 from config.settings import load_settings
 from agents.orchestrator import AgentOrchestrator
 from api.openrouter import OpenRouterAPI
 
-# Set up logging
+# Set up logging; file records are buffered and written in batches of 256, or right away on errors
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+file_handler = logging.FileHandler("manus_agent.log", delay=True)
+file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
         logging.StreamHandler(),
-        logging.FileHandler("manus_agent.log")
+        MemoryHandler(capacity=256, flushLevel=logging.ERROR, target=file_handler)
     ]
 )
 logger = logging.getLogger(__name__)
@@ -39,14 +42,15 @@ def main():
         settings = load_settings()
         logger.info("Application settings loaded")
         
-        # Initialize OpenRouter API client
-        api_key = os.getenv("OPENROUTER_API_KEY")
+        # Initialize OpenRouter API client with the key and model from the settings, which
+        # include the values saved from the settings tab
+        api_key = settings.openrouter_api_key
         if not api_key:
-            logger.error("OPENROUTER_API_KEY not found in environment variables")
+            logger.error("OPENROUTER_API_KEY not found in environment variables or saved settings")
             print("Error: OPENROUTER_API_KEY not found. Please set it in your .env file.")
             sys.exit(1)
             
-        openrouter_client = OpenRouterAPI(api_key)
+        openrouter_client = OpenRouterAPI(api_key, default_model=settings.default_model)
         logger.info("OpenRouter API client initialized")
         
         # Initialize agent orchestrator
@@ -54,7 +58,11 @@ def main():
         logger.info("Agent orchestrator initialized")
         
         # Start the GUI application
-        start_gui(orchestrator)
+        from gui.app import start_gui
+        try:
+            start_gui(orchestrator)
+        finally:
+            openrouter_client.close()
         
     except Exception as e:
         logger.error(f"Error in main application: {str(e)}", exc_info=True)